@@ -9,13 +9,17 @@ and place and amenity
 from flask import Flask, jsonify, make_response
 from flask_cors import CORS
 from models import storage
+from api.v1.compression import compress
+from api.v1.json_provider import JSONProvider
 from api.v1.views import app_views
 import os
 
 
 app = Flask(__name__)
+app.json = JSONProvider(app)
 CORS(app, resources={r"/*": {"origins": "0.0.0.0"}})
 app.register_blueprint(app_views)
+compress(app)
 
 
 host = os.getenv('HBNB_API_HOST', '0.0.0.0')
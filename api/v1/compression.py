@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Response compression negotiated on Accept-Encoding
+
+compress(app) makes app encode its text and JSON responses with brotli,
+when the brotli package is installed, or gzip, whichever the client's
+Accept-Encoding prefers. Responses of HBNB_COMPRESS_MIN_SIZE bytes or
+less (default 500) are sent as they are, and HBNB_COMPRESS_LEVEL (gzip,
+default 6, 0 turns compression off) and HBNB_COMPRESS_BROTLI_LEVEL
+(default 4) trade CPU time for size.
+
+Streamed responses are compressed a chunk at a time as they are
+generated, each chunk flushed so the client receives it at once. Their
+length is unknown when the headers are sent, so they are compressed
+whatever their size, HBNB_COMPRESS_MIN_SIZE notwithstanding.
+"""
+
+from flask import request
+import gzip
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# integer - size in bytes above which a response is compressed
+min_size = int(os.getenv('HBNB_COMPRESS_MIN_SIZE', 500))
+# integer - gzip compression level, 1 (fastest) to 9 (smallest)
+level = int(os.getenv('HBNB_COMPRESS_LEVEL', 6))
+# integer - brotli quality, 0 (fastest) to 11 (smallest)
+brotli_level = int(os.getenv('HBNB_COMPRESS_BROTLI_LEVEL', 4))
+# tuple - media types worth compressing
+mimetypes = ('application/json', 'application/javascript',
+             'application/xml', 'image/svg+xml', 'text/css', 'text/html',
+             'text/javascript', 'text/plain', 'text/xml')
+
+
+def compress(app):
+    """
+    Makes app compress the responses it sends, and returns app
+    """
+    if level > 0:
+        app.after_request(compressed)
+    return app
+
+
+def compressed(response):
+    """
+    Returns response encoded as the request prefers, or as it is when it
+    is not worth compressing
+    """
+    if response.mimetype not in mimetypes or \
+       response.status_code < 200 or response.status_code in (204, 304) or \
+       response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(
+        ['br', 'gzip'] if brotli is not None else ['gzip'])
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = streamed(response.iter_encoded(), encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) <= min_size:
+            return response
+        if encoding == 'br':
+            body = brotli.compress(data, quality=brotli_level)
+        else:
+            body = gzip.compress(data, level, mtime=0)
+        if len(body) >= len(data):
+            return response
+        response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        # the bytes differ from the identity encoding's, the content not
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def streamed(chunks, encoding):
+    """
+    Yields the chunks of bytes chunks compressed with encoding, flushing
+    the compressor after each one
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_level)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + \
+                compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Compact JSON for jsonify() and request.get_json()
+
+JSONProvider writes JSON with orjson when the orjson package is
+installed, and with the json module otherwise, always without the
+spaces after separators. Both write datetimes themselves in ISO 8601,
+the layout of BaseModel.to_dict(), so the views can hand them
+to_dict(format_dates=False) rather than strings formatted one at a time.
+
+orjson writes non-ASCII characters as UTF-8 rather than escaping them;
+a value it cannot write, such as an integer wider than 64 bits, is
+written by the json module instead.
+"""
+
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default(obj):
+    """
+    Returns a JSON serializable version of obj, dates and datetimes as
+    ISO 8601 strings
+    """
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Compact JSON provider using orjson when it is installed"""
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        """Returns obj serialized as a JSON string"""
+        return self.encode(obj, **kwargs).decode()
+
+    def encode(self, obj, **kwargs):
+        """
+        Returns obj serialized as UTF-8 JSON bytes
+
+        Keyword arguments other than separators, such as indent, are
+        passed on to json.dumps().
+        """
+        kwargs.pop("separators", None)
+        if orjson is not None and not kwargs:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=default, option=option)
+            except TypeError:
+                pass
+        kwargs.setdefault("default", default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        if kwargs.get("indent") is None:
+            kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs).encode()
+
+    def loads(self, s, **kwargs):
+        """Returns the value of the JSON string or bytes s"""
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """
+        Returns a response of the arguments serialized as jsonify() does,
+        encoded once as bytes
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or \
+           self.compact is False:
+            body = self.encode(obj, indent=2)
+        else:
+            body = self.encode(obj)
+        return self._app.response_class(body + b"\n",
+                                        mimetype=self.mimetype)
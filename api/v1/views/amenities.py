@@ -4,6 +4,10 @@ view for Amenity objects that handles all
 default RESTFul API actions
 """
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import collection_tag, not_modified, \
+    object_tag
+from api.v1.views.pagination import paginated
+from api.v1.views.streaming import streamed
 from flask import jsonify, abort, request
 from models.amenity import Amenity
 
@@ -14,13 +18,16 @@ def get_amenities():
     Retrieves the list of all Amenity objects.
 
     Returns:
-        - JSON: List of dictionaries representing all Amenity objects.
+        - JSON: List of dictionaries representing all Amenity objects,
+            or one page of them when ?limit= or ?cursor= is given.
     """
-    amenities = []
-    amenities_obj = storage.all(Amenity)
-    for amenity in amenities_obj.values():
-        amenities.append(amenity.to_dict())
-    return jsonify(amenities)
+    unchanged = not_modified(collection_tag(Amenity))
+    if unchanged is not None:
+        return unchanged
+    page = paginated(Amenity)
+    if page is not None:
+        return page
+    return streamed(storage.iter_all(Amenity))
 
 
 @app_views.route('/amenities/<amenity_id>', methods=["GET"],
@@ -39,6 +46,9 @@ def get_amenity_by_id(amenity_id):
     amenity = storage.get(Amenity, amenity_id)
     if amenity is None:
         abort(404)
+    unchanged = not_modified(object_tag(amenity))
+    if unchanged is not None:
+        return unchanged
     return jsonify(amenity.to_dict())
 
 
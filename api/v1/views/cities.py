@@ -5,6 +5,10 @@ the airbnb api
 """
 
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import collection_tag, not_modified, \
+    object_tag
+from api.v1.views.pagination import paginated
+from api.v1.views.streaming import streamed
 from flask import abort, jsonify, request
 from models.city import City
 from models.state import State
@@ -15,18 +19,21 @@ from models.state import State
 def get_city(state_id):
     """
     Retrieves the list of all City objects of a State
-    given by state id
+    given by state id, or one page of it when ?limit= or ?cursor=
+    is given
     """
-    cities_list = []
-
     state = storage.get(State, state_id)
     if state is None:
         abort(404)
 
-    for city in state.cities:
-        cities_list.append(city.to_dict())
+    unchanged = not_modified(collection_tag(City))
+    if unchanged is not None:
+        return unchanged
+    page = paginated(City, state_id=state.id)
+    if page is not None:
+        return page
 
-    return jsonify(cities_list)
+    return streamed(state.cities)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'],
@@ -40,6 +47,9 @@ def get_city_by_id(city_id):
     if city is None:
         abort(404)
 
+    unchanged = not_modified(object_tag(city))
+    if unchanged is not None:
+        return unchanged
     return jsonify(city.to_dict())
 
 
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""
+Conditional GET support shared by the views
+
+A view tags what it is about to send, before serializing anything: one
+object by its class, id and updated_at, a list by the version storage
+keeps of the class it lists. The response carries the tag as its ETag and
+Last-Modified headers, and a request already holding the tagged
+representation (If-None-Match, or If-Modified-Since without it) gets a
+304 Not Modified instead. A list whose storage cannot date deletions, as
+DBStorage cannot, has no Last-Modified, so only If-None-Match applies;
+neither has a representation changed within the current second.
+"""
+
+from api.v1.views import app_views, storage
+from datetime import datetime, timezone
+from flask import Response, g, request
+import hashlib
+from models.engine.query import stamp
+
+
+def object_tag(obj):
+    """
+    Returns the (ETag, Last-Modified) of the representation of obj
+    """
+    return etag_of(obj.__class__.__name__, obj.id,
+                   stamp(obj.updated_at)), obj.updated_at
+
+
+def collection_tag(cls):
+    """
+    Returns the (ETag, Last-Modified) of the lists of cls objects
+    """
+    tag, when = storage.version(cls)
+    name = cls if isinstance(cls, str) else cls.__name__
+    return etag_of(name, tag), when
+
+
+def combined(*tags):
+    """
+    Returns the (ETag, Last-Modified) of a representation depending on
+    everything tags are the tags of; it has no Last-Modified unless every
+    tag has one
+    """
+    times = [when for etag, when in tags]
+    return (etag_of(*(etag for etag, when in tags)),
+            None if None in times else max(times))
+
+
+def etag_of(*parts):
+    """
+    Returns a strong entity tag naming parts
+    """
+    digest = hashlib.blake2b("|".join(parts).encode("utf-8"),
+                             digest_size=12)
+    return digest.hexdigest()
+
+
+def not_modified(tag):
+    """
+    Returns a 304 response if the request already holds the
+    representation tagged tag, None otherwise; either way the response
+    will carry the headers of tag
+    """
+    etag, when = tag
+    g.conditional_tag = tag
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        since = request.if_modified_since
+        fresh = since is not None and when is not None and \
+            when.replace(microsecond=0, tzinfo=timezone.utc) <= since
+    return Response(status=304) if fresh else None
+
+
+@app_views.after_request
+def tag_response(response):
+    """
+    Sets the ETag and Last-Modified headers of a response to a view that
+    called not_modified()
+    """
+    tag = g.pop("conditional_tag", None)
+    if tag is not None and response.status_code in (200, 304):
+        etag, when = tag
+        response.set_etag(etag)
+        # a date names a whole second, so it only validates once no other
+        # change can fall within that second
+        if when is not None and when.replace(microsecond=0) < \
+           datetime.utcnow().replace(microsecond=0):
+            response.last_modified = when.replace(tzinfo=timezone.utc)
+    return response
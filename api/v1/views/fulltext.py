@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+"""
+View for the full-text search over place descriptions and review texts
+"""
+from api.v1.views import app_views, storage
+from api.v1.views.pagination import link_next, page_args, page_size
+from flask import abort, jsonify, request
+
+
+@app_views.route('/search', methods=['GET'], strict_slashes=False)
+def search_text():
+    """
+    Retrieves the places and reviews whose description or text contains
+    a term of ?q=, best BM25 match first, each with its "score"; results
+    come one page at a time, ?limit= (default HBNB_API_PAGE_SIZE) long,
+    and ?cursor= names the next page
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        abort(400, "Missing q")
+    args = page_args()
+    limit, cursor = (page_size, None) if args is None else args
+    try:
+        found, next_cursor = storage.search_text(query, limit, cursor)
+    except ValueError:
+        abort(400, "Invalid cursor")
+    return link_next(jsonify([dict(obj.to_dict(format_dates=False),
+                                   score=score)
+                              for score, obj in found]),
+                     limit, next_cursor)
@@ -19,13 +19,14 @@ def get_stauts():
 @app_views.route('/stats', methods=['GET'], strict_slashes=False)
 def get_stats():
     """retreive the number of objects y calling"""
+    counts = storage.counts()
     classes = {
-        "amenities": storage.count("Amenity"),
-        "cities": storage.count("City"),
-        "places": storage.count("Place"),
-        "reviews": storage.count("Review"),
-        "states": storage.count("State"),
-        "users": storage.count("User"),
+        "amenities": counts.get("Amenity", 0),
+        "cities": counts.get("City", 0),
+        "places": counts.get("Place", 0),
+        "reviews": counts.get("Review", 0),
+        "states": counts.get("State", 0),
+        "users": counts.get("User", 0),
         }
 
     return jsonify(classes), 200
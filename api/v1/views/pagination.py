@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Cursor pagination shared by the list views
+
+A list view answers with every object unless the request carries ?limit=
+or ?cursor=; it then answers with one page, in (created_at, id) order, and
+names the next page in an X-Next-Cursor header and a Link rel="next"
+header. The last page has neither.
+"""
+
+from flask import abort, jsonify, request
+from models import storage
+from models.engine.query import page_of
+import os
+from urllib.parse import urlencode
+
+# integer - page size when only ?cursor= is given
+page_size = int(os.getenv('HBNB_API_PAGE_SIZE', 50))
+# integer - largest page size a request may ask for
+max_page_size = int(os.getenv('HBNB_API_MAX_PAGE_SIZE', 1000))
+
+
+def page_args():
+    """
+    Returns (limit, cursor) of the page the request asks for, or None if
+    the request is not paginated
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return None
+    if limit is None:
+        limit = page_size
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            abort(400, "Invalid limit")
+        if limit < 1:
+            abort(400, "Invalid limit")
+    return min(limit, max_page_size), cursor
+
+
+def page_response(page, limit, next_cursor):
+    """
+    Returns the JSON response for a page of objects, naming the next
+    page in its headers unless next_cursor is None
+    """
+    return link_next(jsonify([obj.to_dict(format_dates=False)
+                              for obj in page]), limit,
+                     next_cursor)
+
+
+def link_next(response, limit, next_cursor):
+    """
+    Names the next page in the headers of response unless next_cursor is
+    None, and returns response
+    """
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = request.args.to_dict()
+        args.update(limit=limit, cursor=next_cursor)
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response
+
+
+def paginated(cls, objects=None, **criteria):
+    """
+    Returns the page of cls objects matching criteria the request asks
+    for as a JSON response, or None if the request is not paginated.
+    objects, when given, is the list to page through instead of storage.
+    """
+    args = page_args()
+    if args is None:
+        return None
+    limit, cursor = args
+    try:
+        if objects is not None:
+            page, next_cursor = page_of(objects, limit, cursor)
+        else:
+            page, next_cursor = storage.page(cls, limit, cursor, **criteria)
+    except ValueError:
+        abort(400, "Invalid cursor")
+    return page_response(page, limit, next_cursor)
@@ -4,6 +4,11 @@ View for Place objects that handles all
 default RESTFul API actions.
 """
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import collection_tag, not_modified, \
+    object_tag
+from api.v1.views.pagination import page_args, page_response, paginated, \
+    page_size
+from api.v1.views.streaming import streamed
 from flask import jsonify, abort, request
 from models.place import Place
 from models.state import State
@@ -11,6 +16,8 @@ from models.amenity import Amenity
 from models.city import City
 from models.user import User
 from models import storage_t
+from models.engine.geo import coordinates
+from models.engine.search import RANGE_FIELDS
 
 
 @app_views.route('/cities/<city_id>/places', methods=['GET'],
@@ -24,17 +31,22 @@ def get_places_of_city(city_id):
 
     Returns:
         - JSON: List of dictionaries representing all Place objects
-            in the City.
+            in the City, or one page of them when ?limit= or ?cursor=
+            is given.
         - 404: If the City object is not found.
     """
     city = storage.get(City, city_id)
     if city is None:
         abort(404)
 
-    places = []
-    for place in city.places:
-        places.append(place.to_dict())
-    return jsonify(places)
+    unchanged = not_modified(collection_tag(Place))
+    if unchanged is not None:
+        return unchanged
+    page = paginated(Place, city_id=city.id)
+    if page is not None:
+        return page
+
+    return streamed(city.places)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'], strict_slashes=False)
@@ -53,6 +65,9 @@ def get_place(place_id):
     if place is None:
         abort(404)
 
+    unchanged = not_modified(object_tag(place))
+    if unchanged is not None:
+        return unchanged
     return jsonify(place.to_dict())
 
 
@@ -152,47 +167,117 @@ def update_place(place_id):
 
 @app_views.route("/places_search", methods=['POST'])
 def search():
-    """Handle the search for the API"""
+    """
+    Handle the search for the API: the places in the cities listed or in
+    a city of the states listed (every place if neither is) that have
+    every amenity listed. The search runs in storage, as one SQL query in
+    DB mode; ?limit= and ?cursor= page through the results.
+
+    Each of RANGE_FIELDS may be bounded with {"min": n, "max": n}, and
+    "sort" names one of them to order the results by, cheapest first, or
+    dearest first with a leading "-"; with ?limit= only that many places
+    are read from the sorted index. "bounds" keeps the places inside a
+    {"south", "west", "north", "east"} box of coordinates.
+    """
     request_json = request.get_json(silent=True)
     if request_json is None:
         abort(400, "Not a JSON")
 
-    places_obj = [place for place in storage.all(Place).values()]
-    states_ids = request_json.get('states', [])
-    cities_ids = request_json.get('cities', [])
-    amenities_ids = request_json.get('amenities', [])
-
-    cities = set()
-
-    # Collect all city IDs from the given state IDs
-    if states_ids:
-        cities_obj = storage.all(City)
-        state_cities = [city.id for city in cities_obj.values()
-                        if city.state_id in states_ids]
-        cities.update(state_cities)
-
-    # Include explicitly specified city IDs
-    if cities_ids:
-        cities.update(cities_ids)
-
-    # Collect all places from the identified cities
-    all_places = []
-    if cities:
-        for city_id in cities:
-            city = storage.get(City, city_id)
-            if city:
-                all_places.extend(city.places)
-    else:
-        all_places = places_obj
-
-    # Filter places based on amenities
-    final_places = []
-    if amenities_ids:
-        for place in all_places:
-            place_amenities_ids = [amenity.id for amenity in place.amenities]
-            if all(am_id in place_amenities_ids for am_id in amenities_ids):
-                final_places.append(place.to_dict())
-    else:
-        final_places = [place.to_dict() for place in all_places]
-
-    return jsonify(final_places)
+    criteria = {
+        "states": request_json.get('states') or [],
+        "cities": request_json.get('cities') or [],
+        "amenities": request_json.get('amenities') or [],
+        "ranges": search_ranges(request_json),
+        "bounds": search_bounds(request_json),
+        "sort": search_sort(request_json),
+    }
+
+    args = page_args()
+    if args is not None:
+        limit, cursor = args
+        try:
+            page, next_cursor = storage.search_places(
+                limit=limit, cursor=cursor, **criteria)
+        except ValueError:
+            abort(400, "Invalid cursor")
+        return page_response(page, limit, next_cursor)
+
+    def matching():
+        """yields the matching places; it runs while the response is
+        streamed, so every object it reads comes from the same session"""
+        places, next_cursor = storage.search_places(**criteria)
+        yield from places
+
+    return streamed(matching())
+
+
+def search_ranges(request_json):
+    """returns {field: (min, max)} for the RANGE_FIELDS bounded in a
+    places_search body, aborting with 400 on a malformed bound"""
+    ranges = {}
+    for field in RANGE_FIELDS:
+        bounds = request_json.get(field)
+        if bounds is None:
+            continue
+        if not isinstance(bounds, dict) or \
+           set(bounds) - {"min", "max"}:
+            abort(400, "Invalid range for {}".format(field))
+        low, high = bounds.get("min"), bounds.get("max")
+        for value in (low, high):
+            if value is not None and (isinstance(value, bool) or
+                                      not isinstance(value, (int, float))):
+                abort(400, "Invalid range for {}".format(field))
+        ranges[field] = (low, high)
+    return ranges
+
+
+def search_sort(request_json):
+    """returns (field, descending) for the "sort" of a places_search body,
+    or None, aborting with 400 on a field that cannot be sorted on"""
+    sort = request_json.get("sort")
+    if sort is None:
+        return None
+    if not isinstance(sort, str) or sort.lstrip("-") not in RANGE_FIELDS:
+        abort(400, "Invalid sort")
+    return sort.lstrip("-"), sort.startswith("-")
+
+
+def search_bounds(request_json):
+    """returns the (south, west, north, east) "bounds" of a places_search
+    body, or None, aborting with 400 on a malformed box"""
+    bounds = request_json.get("bounds")
+    if bounds is None:
+        return None
+    if not isinstance(bounds, dict):
+        abort(400, "Invalid bounds")
+    south = coordinates(bounds.get("south"), bounds.get("west"))
+    north = coordinates(bounds.get("north"), bounds.get("east"))
+    if south is None or north is None or south[0] > north[0]:
+        abort(400, "Invalid bounds")
+    return south[0], south[1], north[0], north[1]
+
+
+@app_views.route("/places_near", methods=['GET'], strict_slashes=False)
+def places_near():
+    """
+    Retrieves the places within ?radius= kilometres (10 by default) of
+    ?lat= and ?lng=, nearest first, each with its "distance" in
+    kilometres; ?limit= caps their number. The list has no further pages,
+    so a ?cursor= is refused.
+    """
+    try:
+        point = coordinates(float(request.args['lat']),
+                            float(request.args['lng']))
+        radius = float(request.args.get('radius', 10))
+    except (KeyError, ValueError):
+        abort(400, "Invalid location")
+    if point is None or not radius >= 0:
+        abort(400, "Invalid location")
+    if 'cursor' in request.args:
+        abort(400, "Invalid cursor")
+    args = page_args()
+    limit = page_size if args is None else args[0]
+    found = storage.places_near(point[0], point[1], radius, limit)
+    return jsonify([dict(place.to_dict(format_dates=False),
+                         distance=away)
+                    for away, place in found])
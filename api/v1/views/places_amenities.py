@@ -7,27 +7,37 @@ for the airbnb api
 
 from flask import jsonify, abort
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import collection_tag, combined, \
+    not_modified, object_tag
+from api.v1.views.pagination import paginated
+from api.v1.views.streaming import streamed
 from models.place import Place
 from models.amenity import Amenity
-from os import getenv
+from models import storage_t
 
 
 @app_views.route('/places/<place_id>/amenities', methods=['GET'],
                  strict_slashes=False)
 def get_amenity_place_id(place_id):
     """
-    Retreive amenity by place id
+    Retreive amenity by place id, or one page of them when ?limit=
+    or ?cursor= is given
     """
 
     place = storage.get(Place, str(place_id))
     if place is None:
         abort(404)
 
-    amenity_list = []
-    for obj in place.amenities:
-        amenity_list.append(obj.to_dict())
+    unchanged = not_modified(combined(object_tag(place),
+                                      collection_tag(Amenity)))
+    if unchanged is not None:
+        return unchanged
 
-    return jsonify(amenity_list)
+    page = paginated(Amenity, objects=place.amenities)
+    if page is not None:
+        return page
+
+    return streamed(place.amenities)
 
 
 @app_views.route('/places/<place_id>/amenities/<amenity_id>',
@@ -51,10 +61,11 @@ def delete_amenity(place_id, amenity_id):
 
     for obj in place_obj.amenities:
         if str(obj.id) == amenity_id:
-            if getenv("HBNB_TYPE_STORAGE") == "db":
+            if storage_t == "db":
                 place_obj.amenities.remove(obj)
             else:
-                place_obj.amenity_ids.remove(obj.id)
+                place_obj.amenity_ids = [i for i in place_obj.amenity_ids
+                                         if i != obj.id]
             place_obj.save()
             return jsonify({}), 200
     abort(404)
@@ -78,6 +89,9 @@ def post_amenity(place_id, amenity_id):
 
     if amenity_id in place_amenities_ids:
         return jsonify(amenity_obj.to_dict()), 200
-    place_obj.amenities.append(amenity_obj)
+    if storage_t == "db":
+        place_obj.amenities.append(amenity_obj)
+    else:
+        place_obj.amenities = amenity_obj
     place_obj.save()
     return jsonify(amenity_obj.to_dict()), 201
@@ -4,6 +4,10 @@ View for Place objects that handles all
 default RESTFul API actions.
 """
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import collection_tag, not_modified, \
+    object_tag
+from api.v1.views.pagination import paginated
+from api.v1.views.streaming import streamed
 from flask import jsonify, abort, request
 from models.place import Place
 from models.review import Review
@@ -21,17 +25,22 @@ def get_reviews_of_places(place_id):
 
     Returns:
         - JSON: List of dictionaries representing all Review objects
-            for the Place.
+            for the Place, or one page of them when ?limit= or ?cursor=
+            is given.
         - 404: If the Place object is not found.
     """
     place = storage.get(Place, place_id)
     if place is None:
         abort(404)
 
-    reviews = []
-    for review in place.reviews:
-        reviews.append(review.to_dict())
-    return jsonify(reviews)
+    unchanged = not_modified(collection_tag(Review))
+    if unchanged is not None:
+        return unchanged
+    page = paginated(Review, place_id=place.id)
+    if page is not None:
+        return page
+
+    return streamed(place.reviews)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'], strict_slashes=False)
@@ -50,6 +59,9 @@ def get_review(review_id):
     if review is None:
         abort(404)
 
+    unchanged = not_modified(object_tag(review))
+    if unchanged is not None:
+        return unchanged
     return jsonify(review.to_dict())
 
 
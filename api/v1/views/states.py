@@ -5,6 +5,10 @@ default RESTFul API actions
 """
 
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import collection_tag, not_modified, \
+    object_tag
+from api.v1.views.pagination import paginated
+from api.v1.views.streaming import streamed
 from flask import abort, jsonify, request
 from models.state import State
 
@@ -12,15 +16,16 @@ from models.state import State
 @app_views.route("/states", methods=["GET"], strict_slashes=False)
 def get_state():
     """
-    Retrieves the list of all State object
+    Retrieves the list of all State object, or one page of it when
+    ?limit= or ?cursor= is given
     """
-    states = []
-    state_object = storage.all("State")
-
-    for state in state_object.values():
-        states.append(state.to_dict())
-
-    return jsonify(states)
+    unchanged = not_modified(collection_tag(State))
+    if unchanged is not None:
+        return unchanged
+    page = paginated(State)
+    if page is not None:
+        return page
+    return streamed(storage.iter_all("State"))
 
 
 @app_views.route("/states/<state_id>",  methods=["GET"], strict_slashes=False)
@@ -35,6 +40,9 @@ def get_state_by_id(state_id):
     if state is None:
         abort(404)
 
+    unchanged = not_modified(object_tag(state))
+    if unchanged is not None:
+        return unchanged
     return jsonify(state.to_dict())
 
 
@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""
+Streamed JSON array responses shared by the list views
+
+Instead of building a list of dictionaries and one big JSON string, the
+array is written a chunk of objects at a time while the objects are read
+from storage, so a worker holds one chunk rather than the whole list.
+"""
+
+from flask import Response, current_app, stream_with_context
+import os
+
+# integer - number of objects serialized per chunk of the response
+chunk_size = int(os.getenv('HBNB_API_STREAM_CHUNK', 100))
+
+
+def streamed(objects):
+    """
+    Returns a response streaming the to_dict() of every object in the
+    iterable objects as a JSON array, each chunk serialized as one list
+
+    The view's application context is torn down (and a DBStorage session
+    closed) before the body is streamed, so objects should come from a
+    generator that queries storage as it is iterated rather than from
+    queries run inside the view.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        """yields the array a chunk of objects at a time"""
+        chunk = []
+        sep = "["
+        for obj in objects:
+            chunk.append(obj.to_dict(format_dates=False))
+            if len(chunk) >= chunk_size:
+                yield sep + dumps(chunk, separators=(",", ":"))[1:-1]
+                chunk, sep = [], ","
+        if chunk:
+            yield sep + dumps(chunk, separators=(",", ":"))[1:-1]
+            sep = ","
+        yield "[]\n" if sep == "[" else "]\n"
+
+    return Response(stream_with_context(generate()),
+                    mimetype=current_app.json.mimetype)
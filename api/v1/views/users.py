@@ -4,6 +4,10 @@ View for User objects that handles all
 default RESTFul API actions.
 """
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import collection_tag, not_modified, \
+    object_tag
+from api.v1.views.pagination import paginated
+from api.v1.views.streaming import streamed
 from flask import jsonify, abort, request
 from models.user import User
 
@@ -14,13 +18,16 @@ def get_users():
     Retrieves the list of all User objects.
 
     Returns:
-        - JSON: List of dictionaries representing all User objects.
+        - JSON: List of dictionaries representing all User objects,
+            or one page of them when ?limit= or ?cursor= is given.
     """
-    users = []
-    users_obj = storage.all(User)
-    for user in users_obj.values():
-        users.append(user.to_dict())
-    return jsonify(users)
+    unchanged = not_modified(collection_tag(User))
+    if unchanged is not None:
+        return unchanged
+    page = paginated(User)
+    if page is not None:
+        return page
+    return streamed(storage.iter_all(User))
 
 
 @app_views.route('/users/<user_id>', methods=["GET"], strict_slashes=False)
@@ -38,6 +45,9 @@ def get_user_by_id(user_id):
     user = storage.get(User, user_id)
     if user is None:
         abort(404)
+    unchanged = not_modified(object_tag(user))
+    if unchanged is not None:
+        return unchanged
     return jsonify(user.to_dict())
 
 
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Benchmarks FileStorage start-up on a generated file.json
+
+usage: ./benchmarks/bench_file_storage.py [number of objects]
+
+Each measurement runs in a fresh interpreter inside a temporary directory
+and reports wall time and peak RSS after loading the snapshot, then after
+building every instance with all(), for file.json and for file.bin.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from models import storage
+loaded = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+count = storage.count()
+start = time.perf_counter()
+storage.all()
+built = time.perf_counter() - start
+rss_all = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(count, loaded, rss, built, rss_all)
+"""
+
+
+def make_file(path, n):
+    """writes a file.json holding n Place objects"""
+    stamp = "2024-05-23T16:37:32.334603"
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(n):
+            oid = str(uuid.uuid4())
+            obj = {"id": oid, "created_at": stamp, "updated_at": stamp,
+                   "__class__": "Place", "name": "place {}".format(i),
+                   "city_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()),
+                   "number_rooms": i % 5, "price_by_night": i % 300,
+                   "latitude": 37.7, "longitude": -122.4}
+            f.write("{}{}: {}".format("," if i else "",
+                                      json.dumps("Place." + oid),
+                                      json.dumps(obj)))
+        f.write("}")
+
+
+def probe(tmp, file_format):
+    """loads the snapshot in tmp in a fresh interpreter"""
+    env = dict(os.environ)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    env["HBNB_FILE_FORMAT"] = file_format
+    out = subprocess.check_output(
+        [sys.executable, "-c", PROBE.format(root=ROOT)],
+        cwd=tmp, env=env, universal_newlines=True)
+    count, loaded, rss, built, rss_all = out.split()
+    print("{} start-up:    {:.2f} s, peak RSS {:.0f} MiB".format(
+        file_format.ljust(6), float(loaded), int(rss) / 1024))
+    print("{} all() after: {:.2f} s, peak RSS {:.0f} MiB".format(
+        file_format.ljust(6), float(built), int(rss_all) / 1024))
+
+
+def main():
+    """generates the file and runs the probe against it"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        make_file(os.path.join(tmp, "file.json"), n)
+        # convert in a child: peak RSS is inherited by the probes otherwise
+        subprocess.check_call(
+            [sys.executable,
+             os.path.join(ROOT, "models", "engine", "binary_format.py"),
+             os.path.join(tmp, "file.json"), os.path.join(tmp, "file.bin")])
+        print("objects: {} (file.json {:.1f} MiB, file.bin {:.1f} MiB)".format(
+            n, os.path.getsize(os.path.join(tmp, "file.json")) / 2**20,
+            os.path.getsize(os.path.join(tmp, "file.bin")) / 2**20))
+        probe(tmp, "json")
+        probe(tmp, "binary")
+
+
+if __name__ == "__main__":
+    main()
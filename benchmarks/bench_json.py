@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Benchmarks JSON serialization of the API's list endpoints
+
+usage: ./benchmarks/bench_json.py [number of places]
+
+The places of one city are serialized as the list views answer them,
+with JSONProvider writing through orjson, through the json module, and
+with Flask's own provider over the strftime-formatted to_dict() it
+replaced. The streamed GET /api/v1/cities/<city_id>/places is then timed
+through the API's test client.
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def best_of(func, runs=5):
+    """returns the shortest of runs timings of func(), in milliseconds"""
+    best = None
+    for i in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(n):
+    """fills a FileStorage with n places in one city and times listing
+    them"""
+    os.chdir(tempfile.mkdtemp())
+    os.environ.pop("HBNB_TYPE_STORAGE", None)
+    sys.path.insert(0, ROOT)
+    from api.v1 import json_provider
+    from api.v1.app import app
+    from flask.json.provider import DefaultJSONProvider
+    from models import storage
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+
+    state = State(name="California")
+    city = City(name="San Francisco", state_id=state.id)
+    user = User(email="bench@hbnb.io", password="bench")
+    for obj in (state, city, user):
+        storage.new(obj)
+    for i in range(n):
+        storage.new(Place(name="place {}".format(i), city_id=city.id,
+                          user_id=user.id, price_by_night=i % 500,
+                          description="A quiet place, number {}".format(i),
+                          latitude=37.77, longitude=-122.42))
+    places = city.places
+    orjson = json_provider.orjson
+    encoders = [("json", None)]
+    if orjson is not None:
+        encoders.insert(0, ("orjson", orjson))
+    provider = json_provider.JSONProvider(app)
+    flask = DefaultJSONProvider(app)
+
+    print("{:>16} {:>10} {:>10} {:>10}".format(
+        "list", *[name + " ms" for name, module in encoders],
+        "flask ms"))
+    with app.app_context():
+        for count in (1000, len(places)):
+            timings = []
+            for name, module in encoders:
+                json_provider.orjson = module
+                timings.append(best_of(lambda: provider.response(
+                    [place.to_dict(format_dates=False)
+                     for place in places[:count]]).get_data()))
+            timings.append(best_of(lambda: flask.response(
+                [place.to_dict() for place in places[:count]]).get_data()))
+            print("{:>16} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+                "{} places".format(count), *timings))
+
+    client = app.test_client()
+    url = "/api/v1/cities/{}/places".format(city.id)
+    timings = []
+    for name, module in encoders:
+        json_provider.orjson = module
+        timings.append(best_of(lambda: client.get(url).get_data()))
+    json_provider.orjson = orjson
+    print("{:>16} {:>10.1f} {:>10.1f}".format("GET streamed", *timings))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""
+Benchmarks places_search in FileStorage on generated places
+
+usage: ./benchmarks/bench_places_search.py [number of places]
+
+The places are spread over 500 cities of 50 states, each has 3 of 20
+amenities, a price between 10 and 500 and a location in the
+contiguous United States. Each search is timed through
+FileStorage.search_places(), which intersects its indexes, and through
+the scan of models.engine.search that it replaced.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def best_of(func, runs=5):
+    """returns the shortest of runs timings of func(), in milliseconds"""
+    best = None
+    for i in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(n):
+    """fills a FileStorage with n places and times a few searches"""
+    os.chdir(tempfile.mkdtemp())
+    os.environ.pop("HBNB_TYPE_STORAGE", None)
+    sys.path.insert(0, ROOT)
+    from models import storage
+    from models.amenity import Amenity
+    from models.city import City
+    from models.engine import search
+    from models.place import Place
+    from models.state import State
+
+    rand = random.Random(0)
+    states = [State(name="s{}".format(i)) for i in range(50)]
+    cities = [City(name="c{}".format(i), state_id=states[i % 50].id)
+              for i in range(500)]
+    amenities = [Amenity(name="a{}".format(i)) for i in range(20)]
+    for obj in states + cities + amenities:
+        storage.new(obj)
+    for i in range(n):
+        storage.new(Place(name="p{}".format(i),
+                          city_id=rand.choice(cities).id,
+                          price_by_night=rand.randint(10, 500),
+                          latitude=rand.uniform(25, 49),
+                          longitude=rand.uniform(-125, -67),
+                          amenity_ids=[a.id for a in
+                                       rand.sample(amenities, 3)]))
+
+    searches = [
+        ("one state", {"states": [states[0].id]}),
+        ("two amenities", {"amenities": [amenities[0].id,
+                                         amenities[1].id]}),
+        ("state + amenity", {"states": [states[1].id],
+                             "amenities": [amenities[2].id]}),
+        ("cheapest 20", {"amenities": [amenities[3].id],
+                         "sort": ("price_by_night", False), "limit": 20}),
+        ("price range", {"states": [states[2].id],
+                         "ranges": {"price_by_night": (100, 200)}}),
+    ]
+    print("{:>16} {:>10} {:>10} {:>8}".format(
+        "search", "indexed ms", "scan ms", "places"))
+    for label, criteria in searches:
+        found = len(list(storage.search_places(**criteria)[0]))
+        indexed = best_of(lambda: list(
+            storage.search_places(**criteria)[0]))
+        scanned = best_of(lambda: list(
+            search.search_places(storage, **criteria)[0]))
+        print("{:>16} {:>10.3f} {:>10.3f} {:>8}".format(
+            label, indexed, scanned, found))
+    near = (37.77, -122.42, 50, 20)
+    found = len(storage.places_near(*near))
+    indexed = best_of(lambda: storage.places_near(*near))
+    scanned = best_of(lambda: search.places_near(storage, *near))
+    print("{:>16} {:>10.3f} {:>10.3f} {:>8}".format(
+        "20 within 50 km", indexed, scanned, found))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -24,8 +24,8 @@ class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        created_at = Column(DateTime, default=datetime.utcnow, index=True)
+        updated_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -35,11 +35,11 @@ class BaseModel:
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
                 self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
+            elif type(kwargs.get("created_at", None)) is not datetime:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
                 self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
+            elif type(kwargs.get("updated_at", None)) is not datetime:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
                 self.id = str(uuid.uuid4())
@@ -48,6 +48,17 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute, letting the storage re-index a changed
+            foreign key or list of them"""
+            old = self.__dict__.get(name, value)
+            object.__setattr__(self, name, value)
+            if name.endswith(("_id", "_ids")) and old != value:
+                reindex = getattr(models.storage, "reindex", None)
+                if reindex is not None:
+                    reindex(self, name, old)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -59,13 +70,20 @@ class BaseModel:
         models.storage.new(self)
         models.storage.save()
 
-    def to_dict(self, saving_to_file=False):
-        """returns a dictionary containing all keys/values eith curent dict"""
+    def to_dict(self, saving_to_file=False, format_dates=True):
+        """returns a dictionary containing all keys/values eith curent dict
+
+        With format_dates=False, created_at and updated_at are left as
+        datetimes for a JSON encoder that writes them in ISO 8601 itself,
+        except those on a whole second, whose microseconds isoformat()
+        would leave out.
+        """
         new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+        for key in ("created_at", "updated_at"):
+            if key in new_dict:
+                value = new_dict[key]
+                if format_dates or not value.microsecond:
+                    new_dict[key] = value.strftime(time)
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
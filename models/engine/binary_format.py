@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+"""
+Contains the binary snapshot format used by FileStorage
+
+A snapshot starts with a header naming the classes it holds, followed by
+one record per object:
+
+    u32 length of the rest of the record
+    u8  class tag (position of the class name in the header)
+    i64 created_at and i64 updated_at, in microseconds since the epoch
+    u8  length of the id, then the id itself (utf-8)
+    the remaining attributes, marshalled as a dictionary
+
+Timestamps come back as datetime objects, so building an instance needs no
+strptime() call. Snapshots are read through a memory map, and records()
+hands out each record still packed, to be decoded by unpack() when needed.
+Run this module as a script to convert a snapshot from or to file.json:
+
+    ./models/engine/binary_format.py file.json file.bin
+    ./models/engine/binary_format.py file.bin file.json
+"""
+
+from datetime import datetime, timedelta
+import json
+import marshal
+import mmap
+import struct
+import sys
+
+MAGIC = b"HBNB\x01"
+time = "%Y-%m-%dT%H:%M:%S.%f"
+EPOCH = datetime(1970, 1, 1)
+# i64 - stored in place of a missing timestamp
+MISSING = -2 ** 63
+
+_count = struct.Struct("<H")
+_name = struct.Struct("<B")
+_head = struct.Struct("<IBqqB")
+
+
+def to_micros(value):
+    """returns a datetime (or its string form) as microseconds"""
+    if value is None:
+        return MISSING
+    if isinstance(value, str):
+        value = datetime.strptime(value, time)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + \
+        delta.microseconds
+
+
+def encode(tag, record):
+    """returns the bytes of one record, length prefix included"""
+    attrs = dict(record)
+    attrs.pop("__class__", None)
+    oid = attrs.pop("id").encode("utf-8")
+    created = to_micros(attrs.pop("created_at", None))
+    updated = to_micros(attrs.pop("updated_at", None))
+    body = oid + marshal.dumps(attrs)
+    return _head.pack(_head.size - 4 + len(body), tag, created, updated,
+                      len(oid)) + body
+
+
+def decode(buf, offset, names):
+    """returns (key, record, next offset) for the record at offset"""
+    tag, record, end = fields(buf, offset)
+    name = names[tag]
+    record["__class__"] = name
+    return name + "." + record["id"], record, end
+
+
+def unpack(data, name):
+    """returns the record of class name packed in data, the bytes of one
+    record as records() yields them"""
+    tag, record, end = fields(data, 0)
+    record["__class__"] = name
+    return record
+
+
+def fields(buf, offset):
+    """returns (class tag, record without __class__, next offset) for the
+    record at offset"""
+    length, tag, created, updated, id_len = _head.unpack_from(buf, offset)
+    start = offset + _head.size
+    end = offset + 4 + length
+    record = marshal.loads(buf[start + id_len:end])
+    record["id"] = str(buf[start:start + id_len], "utf-8")
+    if created != MISSING:
+        record["created_at"] = EPOCH + timedelta(0, 0, created)
+    if updated != MISSING:
+        record["updated_at"] = EPOCH + timedelta(0, 0, updated)
+    return tag, record, end
+
+
+def dump(items, f, names):
+    """writes the (key, record) pairs in items to the binary file f
+
+    names is the list of class names a record's __class__ may take. A
+    record still packed, as records() yields it, is copied as it is.
+    """
+    tags = {name: tag for tag, name in enumerate(names)}
+    f.write(MAGIC + _count.pack(len(names)))
+    for name in names:
+        raw = name.encode("ascii")
+        f.write(_name.pack(len(raw)) + raw)
+    for key, record in items:
+        if isinstance(record, bytes):
+            tag = tags[key.partition(".")[0]]
+            f.write(record[:4] + _name.pack(tag) + record[5:])
+        else:
+            f.write(encode(tags[record["__class__"]], record))
+
+
+def read_header(buf):
+    """returns (class names, offset of the first record) of a snapshot"""
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not an HBNB binary snapshot")
+    offset = len(MAGIC)
+    count, = _count.unpack_from(buf, offset)
+    offset += _count.size
+    names = []
+    for i in range(count):
+        size, = _name.unpack_from(buf, offset)
+        offset += _name.size
+        names.append(bytes(buf[offset:offset + size]).decode("ascii"))
+        offset += size
+    return names, offset
+
+
+def scan(buf):
+    """yields (key, offset, end) for each record in buf without decoding
+    its attributes"""
+    names, offset = read_header(buf)
+    while offset < len(buf):
+        length, tag, created, updated, id_len = _head.unpack_from(buf, offset)
+        start = offset + _head.size
+        yield (names[tag] + "." + str(buf[start:start + id_len], "utf-8"),
+               offset, offset + 4 + length)
+        offset += 4 + length
+
+
+def load(f):
+    """yields the (key, record) pairs stored in the binary file f"""
+    buf = mapped(f)
+    try:
+        names, offset = read_header(buf)
+        while offset < len(buf):
+            key, record, offset = decode(buf, offset, names)
+            yield key, record
+    finally:
+        close(buf)
+
+
+def records(f):
+    """yields (key, bytes of the record) for each record stored in the
+    binary file f, leaving its attributes packed for unpack()"""
+    buf = mapped(f)
+    try:
+        for key, offset, end in scan(buf):
+            yield key, bytes(buf[offset:end])
+    finally:
+        close(buf)
+
+
+def mapped(f):
+    """returns the contents of the file f as a buffer, a read-only memory
+    map of it when it has one"""
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        return memoryview(f.read())
+
+
+def close(buf):
+    """releases a buffer returned by mapped()"""
+    if isinstance(buf, memoryview):
+        buf.release()
+    else:
+        buf.close()
+
+
+def json_to_binary(src, dst):
+    """converts the JSON snapshot src into the binary snapshot dst"""
+    with open(src, "r") as f:
+        jo = json.load(f)
+    names = sorted({record["__class__"] for record in jo.values()})
+    with open(dst, "wb") as f:
+        dump(jo.items(), f, names)
+
+
+def binary_to_json(src, dst):
+    """converts the binary snapshot src into the JSON snapshot dst"""
+    jo = {}
+    with open(src, "rb") as f:
+        for key, record in load(f):
+            for attr in ("created_at", "updated_at"):
+                if attr in record:
+                    record[attr] = record[attr].strftime(time)
+            jo[key] = record
+    with open(dst, "w") as f:
+        json.dump(jo, f)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: {} <source> <destination>".format(sys.argv[0]))
+        sys.exit(1)
+    with open(sys.argv[1], "rb") as f:
+        is_binary = f.read(len(MAGIC)) == MAGIC
+    if is_binary:
+        binary_to_json(sys.argv[1], sys.argv[2])
+    else:
+        json_to_binary(sys.argv[1], sys.argv[2])
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Contains the LRUCache class
+"""
+
+from collections import OrderedDict
+import threading
+from time import monotonic
+
+
+class LRUCache:
+    """thread-safe mapping of at most size entries, each kept for at most
+    ttl seconds; the least recently used entry is dropped first"""
+
+    def __init__(self, size, ttl):
+        """Instantiate a LRUCache object"""
+        self.__size = size
+        self.__ttl = ttl
+        # OrderedDict - key -> (time.monotonic() it expires at, value)
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """returns the number of entries, expired ones included"""
+        return len(self.__entries)
+
+    def get(self, key):
+        """returns the value cached under key, or None"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= monotonic():
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        """caches value under key, evicting the least recently used entry
+        if the cache is full"""
+        with self.__lock:
+            self.__entries[key] = (monotonic() + self.__ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__size:
+                self.__entries.popitem(last=False)
+
+    def discard(self, key):
+        """drops the entry cached under key, if any"""
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        """drops every entry"""
+        with self.__lock:
+            self.__entries.clear()
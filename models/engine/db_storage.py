@@ -6,15 +6,28 @@ Contains the class DBStorage
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
+from models.engine.query import OPERATORS, cursor_of, parse_criteria, \
+    parse_cursor, parse_sort_cursor, sort_cursor_of, time
+from models.engine.cache import LRUCache
+from models.engine.geo import bounding_box, distance
+from models.engine.indexes import TextIndex
+from models.engine.pool import pool_options
+from models.engine.search import TEXT_FIELDS, text_page
 from models.city import City
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from datetime import datetime
+import heapq
 from os import getenv
+import threading
+from time import monotonic
 import sqlalchemy
 from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm import RelationshipProperty, \
+    make_transient_to_detached, scoped_session, selectinload, sessionmaker
+from sqlalchemy.orm.util import identity_key
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -24,50 +37,108 @@ class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # tuple - (time.monotonic() it expires at, {<class name>: count})
+    __counts = (0.0, None)
 
-    def __init__(self):
-        """Instantiate a DBStorage object"""
-        HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
-        HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
-        HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
-        HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
+    def __init__(self, url=None, **options):
+        """Instantiate a DBStorage object
+
+        Without url, connects to the MySQL database named by the
+        HBNB_MYSQL_* variables; options are passed to create_engine(),
+        on top of the pool settings of models.engine.pool.
+        counts() answers from a cache for HBNB_DB_COUNT_TTL seconds
+        (default 1) unless this storage changes the database meanwhile.
+        With HBNB_DB_GET_CACHE=N, get() keeps the columns of the N objects
+        it returned last for HBNB_DB_GET_CACHE_TTL seconds (default 30).
+        search_text() answers from an in-memory index built on its first
+        use; it follows the commits made through this storage, not those
+        of other processes.
+        """
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        self.__count_ttl = float(getenv('HBNB_DB_COUNT_TTL', '1'))
+        cache_size = int(getenv('HBNB_DB_GET_CACHE', '0'))
+        self.__cache = None
+        # TextIndex - keys by the terms of their TEXT_FIELDS, None until used
+        self.__text = None
+        self.__text_lock = threading.Lock()
+        if cache_size > 0:
+            self.__cache = LRUCache(
+                cache_size, float(getenv('HBNB_DB_GET_CACHE_TTL', '30')))
+        if url is None:
+            HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
+            HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
+            HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
+            HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
+            url = 'mysql+mysqldb://{}:{}@{}/{}'.format(HBNB_MYSQL_USER,
+                                                       HBNB_MYSQL_PWD,
+                                                       HBNB_MYSQL_HOST,
+                                                       HBNB_MYSQL_DB)
+        self.__engine = create_engine(url, **dict(pool_options(),
+                                                  **options))
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, load=None):
+        """query on the current database session
+
+        load names relationships of cls to fetch along with the objects,
+        one extra SELECT ... IN query per relationship, instead of one
+        query per object when each relationship is first read.
+        """
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                objs = self.__session.query(classes[clss]).options(
+                    *self.__eager(classes[clss], load)).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def iter_all(self, cls=None, load=None, chunk_size=1000):
+        """yields the objects of class cls (or of every class), fetching
+        chunk_size rows at a time from a server-side cursor, and the
+        relationships named by load for each chunk"""
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls is clss:
+                query = self.__session.query(classes[clss]).options(
+                    *self.__eager(classes[clss], load))
+                for obj in query.yield_per(chunk_size):
+                    yield obj
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.__counts = (0.0, None)
 
     def save(self):
         """commit all changes of the current database session"""
         self.__session.commit()
+        self.__counts = (0.0, None)
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.__counts = (0.0, None)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        if self.__cache is not None:
+            sqlalchemy.event.listen(sess_factory, "after_flush",
+                                    self.__evict_flushed)
+            sqlalchemy.event.listen(sess_factory, "after_commit",
+                                    self.__evict_committed)
+            sqlalchemy.event.listen(sess_factory, "after_rollback",
+                                    self.__evict_committed)
+        sqlalchemy.event.listen(sess_factory, "after_flush",
+                                self.__text_flushed)
+        sqlalchemy.event.listen(sess_factory, "after_commit",
+                                self.__text_committed)
+        sqlalchemy.event.listen(sess_factory, "after_rollback",
+                                self.__text_rolled_back)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
@@ -76,24 +147,332 @@ class DBStorage:
         self.__session.remove()
 
     def get(self, cls, id):
-        '''method to retrieve one object with spacific id'''
+        '''method to retrieve one object with spacific id
+
+        The session's identity map is looked at first, then the get()
+        cache if there is one; only then is the row selected by its
+        primary key.
+        '''
         if isinstance(cls, str):
-            cls = classes.get(str, None)
-        if cls not in classes.values():
+            cls = classes.get(cls, None)
+        if cls not in classes.values() or id is None:
             return None
-        obj = self.__session.query(cls).filter_by(id=id).first()
-        return (obj)
+        if self.__cache is None:
+            return self.__session.get(cls, id)
+        obj = self.__session.identity_map.get(identity_key(cls, id))
+        if obj is not None:
+            return obj
+        key = (cls.__name__, id)
+        columns = self.__cache.get(key)
+        if columns is not None:
+            return self.__restore(cls, columns)
+        obj = self.__session.get(cls, id)
+        if obj is not None:
+            self.__cache.put(key, {attr.key: getattr(obj, attr.key) for attr
+                                   in sqlalchemy.inspect(cls).column_attrs})
+        return obj
 
     def count(self, cls=None):
         '''method to count the number of objects in storage'''
+        counts = self.counts()
         if cls:
-            if isinstance(cls, str):
-                cls = classes.get(cls, None)
-            if cls not in classes.values():
-                return 0
-            return self.__session.query(cls).count()
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            return counts.get(cls, 0)
+        else:
+            return sum(counts.values())
+
+    def version(self, cls):
+        """returns (tag, datetime or None) for the objects of class cls:
+        the tag changes whenever one of them is added, changed or deleted,
+        and no change was made after the datetime
+
+        The tag comes from one query for the number of rows and their
+        latest updated_at, which is indexed. The datetime is always None:
+        a deleted row leaves no time behind, so no date covers deletions.
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls, None)
+        if cls not in classes.values():
+            return "0", None
+        count, latest = self.__session.query(
+            sqlalchemy.func.count(cls.id),
+            sqlalchemy.func.max(cls.updated_at)).one()
+        if latest is None:
+            return "{}".format(count), None
+        return "{}-{}".format(count, latest.strftime(time)), None
+
+    def pool_status(self):
+        """returns the connection pool's usage: connections checked out,
+        idle and in overflow, and how long checkouts have waited"""
+        pool = self.__engine.pool
+        if hasattr(pool, "status_dict"):
+            return pool.status_dict()
+        return {"status": pool.status()}
+
+    def counts(self):
+        """returns {<class name>: number of rows} for every class
+
+        All the counts come from one UNION ALL query, whose result is kept
+        for HBNB_DB_COUNT_TTL seconds or until new(), delete() or save().
+        """
+        expires, counts = self.__counts
+        if counts is not None and monotonic() < expires:
+            return counts
+        query = sqlalchemy.union_all(*(
+            sqlalchemy.select(sqlalchemy.literal(name).label("name"),
+                              sqlalchemy.func.count().label("count"))
+            .select_from(clss) for name, clss in classes.items()))
+        counts = {name: count for name, count in
+                  self.__session.execute(query)}
+        self.__counts = (monotonic() + self.__count_ttl, counts)
+        return counts
+
+    def filter(self, cls, load=None, **criteria):
+        """returns the cls objects matching every criterion, keyed like
+        all(); see models.engine.query for the criteria syntax
+
+        The criteria become the WHERE clause of a single query; load
+        names relationships to fetch along, as for all().
+        """
+        query = self.__filtered(cls, criteria, load)
+        if query is None:
+            return {}
+        return {obj.__class__.__name__ + '.' + obj.id: obj
+                for obj in query.all()}
+
+    def find_one(self, cls, **criteria):
+        """returns one cls object matching every criterion, or None"""
+        query = self.__filtered(cls, criteria)
+        return None if query is None else query.first()
+
+    def page(self, cls, limit, cursor=None, **criteria):
+        """returns (up to limit cls objects, cursor of the next page or
+        None), walking the objects matching criteria in (created_at, id)
+        order from the page cursor names; raises ValueError for a cursor
+        that does not parse
+
+        The cursor becomes a (created_at, id) > (..., ...) condition, so a
+        page is read from the created_at index whatever its depth.
+        """
+        query = self.__filtered(cls, criteria)
+        if query is None:
+            return [], None
+        return self.__paged(query, query.column_descriptions[0]["entity"],
+                            limit, cursor)
+
+    def search_places(self, states=(), cities=(), amenities=(), ranges=None,
+                      bounds=None, sort=None, limit=None, cursor=None):
+        """returns (places, cursor of the next page or None) for a places
+        search; see models.engine.search
+
+        The search is one statement: places joined to their city when
+        states or cities are listed, and kept only if the place_amenity
+        rows of the amenities listed, grouped by place, number as many as
+        the amenities listed. Ranges, bounds and sort apply to indexed
+        columns, so a sorted page is read from the index up to limit + 1
+        rows.
+        """
+        query = self.__session.query(Place)
+        if states or cities:
+            query = query.join(City, Place.city_id == City.id).filter(
+                sqlalchemy.or_(City.state_id.in_(list(states)),
+                               City.id.in_(list(cities))))
+        wanted = set(amenities)
+        if wanted:
+            link = Base.metadata.tables['place_amenity'].c
+            matched = sqlalchemy.func.count(
+                sqlalchemy.distinct(link.amenity_id))
+            having = sqlalchemy.select(link.place_id).where(
+                link.amenity_id.in_(wanted)).group_by(link.place_id).having(
+                matched == len(wanted))
+            query = query.filter(Place.id.in_(having))
+        for attr, (low, high) in (ranges or {}).items():
+            column = getattr(Place, attr)
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+        if bounds is not None:
+            query = query.filter(*self.__in_box(bounds))
+        if sort is not None:
+            return self.__sorted(query, sort, limit, cursor)
+        if limit is None:
+            return query.yield_per(1000), None
+        return self.__paged(query, Place, limit, cursor)
+
+    def places_near(self, lat, lng, radius, limit=None):
+        """returns [(distance, place)] for the places within radius
+        kilometres of (lat, lng), nearest first; see models.engine.search
+
+        The indexed latitude and longitude columns narrow the places to
+        the box around the circle; only those are measured.
+        """
+        query = self.__session.query(Place).filter(
+            *self.__in_box(bounding_box(lat, lng, radius)))
+        found = []
+        for place in query.yield_per(1000):
+            away = distance(lat, lng, place.latitude, place.longitude)
+            if away <= radius:
+                found.append((away, place.id, place))
+        found = sorted(found) if limit is None else \
+            heapq.nsmallest(limit, found)
+        return [(away, place) for away, oid, place in found]
+
+    def search_text(self, query, limit=None, cursor=None):
+        """returns ([(score, object)], cursor of the next page or None) for
+        a full-text search; see models.engine.search
+
+        Only the postings of the terms of query are read, and only the
+        objects of the page are selected.
+        """
+        return text_page(self.__text_index(), query,
+                         lambda key: self.get(*key.split(".", 1)),
+                         limit, cursor)
+
+    @staticmethod
+    def __in_box(box):
+        """returns the criteria keeping the places inside box"""
+        south, west, north, east = box
+        if west <= east:
+            across = Place.longitude.between(west, east)
+        else:
+            across = sqlalchemy.or_(Place.longitude >= west,
+                                    Place.longitude <= east)
+        return [Place.latitude.between(south, north), across]
+
+    def __sorted(self, query, sort, limit, cursor):
+        """returns (up to limit places of query, cursor of the next page
+        or None) in the (attribute, id) order sort names, every place when
+        limit is None"""
+        attr, descending = sort
+        order = sqlalchemy.tuple_(getattr(Place, attr), Place.id)
+        if cursor is not None:
+            position = sqlalchemy.tuple_(*parse_sort_cursor(cursor))
+            query = query.filter(order < position if descending
+                                 else order > position)
+        if descending:
+            query = query.order_by(getattr(Place, attr).desc(),
+                                   Place.id.desc())
         else:
-            cnt = 0
-            for clss in classes.values():
-                cnt += self.__session.query(clss).count()
-            return (cnt)
+            query = query.order_by(getattr(Place, attr), Place.id)
+        if limit is None:
+            return query.all(), None
+        objs = query.limit(limit + 1).all()
+        if len(objs) > limit:
+            return objs[:limit], sort_cursor_of(objs[limit - 1], attr)
+        return objs, None
+
+    def __paged(self, query, cls, limit, cursor):
+        """returns (up to limit objects of query, cursor of the next page
+        or None), in (created_at, id) order from the page cursor names"""
+        if cursor is not None:
+            created, oid = parse_cursor(cursor)
+            query = query.filter(
+                sqlalchemy.tuple_(cls.created_at, cls.id) >
+                sqlalchemy.tuple_(datetime.strptime(created, time), oid))
+        objs = query.order_by(cls.created_at, cls.id).limit(limit + 1).all()
+        if len(objs) > limit:
+            return objs[:limit], cursor_of(objs[limit - 1])
+        return objs, None
+
+    def __restore(self, cls, columns):
+        """returns the cls object with the cached columns, attached to the
+        current session without a query"""
+        obj = sqlalchemy.inspect(cls).class_manager.new_instance()
+        for attr, value in columns.items():
+            setattr(obj, attr, value)
+        make_transient_to_detached(obj)
+        return self.__session.merge(obj, load=False)
+
+    def __evict_flushed(self, session, flush_context):
+        """drops the objects a flush wrote from the get() cache, and
+        remembers them until the transaction ends"""
+        changed = session.info.setdefault("hbnb_changed", set())
+        for obj in (list(session.new) + list(session.dirty) +
+                    list(session.deleted)):
+            key = (obj.__class__.__name__, obj.id)
+            self.__cache.discard(key)
+            changed.add(key)
+
+    def __evict_committed(self, session):
+        """drops the objects the ended transaction wrote from the get()
+        cache again, in case another session cached them meanwhile"""
+        for key in session.info.pop("hbnb_changed", ()):
+            self.__cache.discard(key)
+
+    def __text_index(self):
+        """returns the TextIndex of the TEXT_FIELDS, building it from their
+        columns on first use"""
+        with self.__text_lock:
+            if self.__text is None:
+                text = TextIndex()
+                for name, attr in TEXT_FIELDS.items():
+                    cls = classes[name]
+                    query = self.__session.query(cls.id, getattr(cls, attr))
+                    for oid, value in query.yield_per(1000):
+                        if isinstance(value, str):
+                            text.add(name + "." + oid, value)
+                self.__text = text
+            return self.__text
+
+    def __text_flushed(self, session, flush_context):
+        """remembers the texts a flush wrote until the transaction ends"""
+        pending = session.info.setdefault("hbnb_text", {})
+        for obj in list(session.new) + list(session.dirty):
+            attr = TEXT_FIELDS.get(obj.__class__.__name__)
+            if attr is not None:
+                pending[obj.__class__.__name__ + "." + obj.id] = getattr(
+                    obj, attr)
+        for obj in session.deleted:
+            if obj.__class__.__name__ in TEXT_FIELDS:
+                pending[obj.__class__.__name__ + "." + obj.id] = None
+
+    def __text_committed(self, session):
+        """applies the texts the committed transaction wrote to the
+        full-text index"""
+        pending = session.info.pop("hbnb_text", {})
+        with self.__text_lock:
+            if self.__text is None:
+                return
+            for key, value in pending.items():
+                if isinstance(value, str):
+                    self.__text.add(key, value)
+                else:
+                    self.__text.discard(key)
+
+    def __text_rolled_back(self, session):
+        """forgets the texts of the transaction rolled back"""
+        session.info.pop("hbnb_text", None)
+
+    def __eager(self, cls, load):
+        """returns the loader options fetching the relationships of cls
+        named by load, or raises ValueError for a name that is not one"""
+        options = []
+        for name in load or ():
+            attr = getattr(cls, name, None)
+            if not isinstance(getattr(attr, "property", None),
+                              RelationshipProperty):
+                raise ValueError("{} has no relationship {}".format(
+                    cls.__name__, name))
+            options.append(selectinload(attr))
+        return options
+
+    def __filtered(self, cls, criteria, load=None):
+        """returns the query of cls objects matching criteria, or None if
+        one names an attribute cls does not have"""
+        if isinstance(cls, str):
+            cls = classes.get(cls, None)
+        if cls not in classes.values():
+            return None
+        query = self.__session.query(cls).options(*self.__eager(cls, load))
+        for attr, op, operand in parse_criteria(criteria):
+            column = getattr(cls, attr, None)
+            if not isinstance(column,
+                              sqlalchemy.orm.attributes.InstrumentedAttribute):
+                return None
+            if op == "in":
+                query = query.filter(column.in_(operand))
+            else:
+                query = query.filter(column.operate(OPERATORS[op], operand))
+        return query
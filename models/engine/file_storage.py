@@ -3,9 +3,23 @@
 Contains the FileStorage class
 """
 
+import atexit
+from datetime import datetime
 import json
+import os
+from sys import intern
+import threading
+import time
 from models.amenity import Amenity
 from models.base_model import BaseModel
+from models.engine import binary_format
+from models.engine.geo import coordinates, in_box
+from models.engine.indexes import GridIndex, InvertedIndex, SortedIndex, \
+    TextIndex
+from models.engine.search import TEXT_FIELDS, in_range, text_page
+from models.engine.query import matches, page_of, parse_criteria, \
+    parse_cursor, parse_sort_cursor, cursor_of, sort_cursor_of, sort_value, \
+    top_of
 from models.city import City
 from models.place import Place
 from models.review import Review
@@ -14,56 +28,306 @@ from models.user import User
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# foreign keys FileStorage keeps a reverse (parent id -> children) index of
+foreign_keys = ("state_id", "city_id", "place_id", "user_id")
+# relationship property -> class name of the objects it returns
+relations = {"cities": "City", "places": "Place", "reviews": "Review",
+             "amenities": "Amenity"}
+
+
+def iter_json_items(f, chunk_size=1 << 20):
+    """yields the (key, value) pairs of the JSON object stored in file f
+
+    The file is read chunk_size characters at a time so that only the
+    current member, not the whole document, has to be held as text.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        """reads the next chunk into buf, dropping what was consumed"""
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf, pos = buf[pos:] + chunk, 0
+
+    def skip_ws():
+        """moves pos to the next non-blank character, reading as needed"""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\n\r":
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def decode():
+        """decodes the JSON value at pos, reading more text if truncated"""
+        nonlocal pos
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buf, pos)
+                return value
+            except ValueError:
+                if eof:
+                    raise
+                fill()
+
+    skip_ws()
+    if buf[pos:pos + 1] != "{":
+        raise ValueError("expected a JSON object")
+    pos += 1
+    skip_ws()
+    if buf[pos:pos + 1] == "}":
+        return
+    while True:
+        skip_ws()
+        key = decode()
+        skip_ws()
+        if buf[pos:pos + 1] != ":":
+            raise ValueError("expected ':' after key {}".format(key))
+        pos += 1
+        skip_ws()
+        yield key, decode()
+        skip_ws()
+        sep = buf[pos:pos + 1]
+        pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError("expected ',' or '}' after {}".format(key))
 
 
 class FileStorage:
-    """serializes instances to a JSON file & deserializes back to instances"""
+    """serializes instances to a JSON file & deserializes back to instances
+
+    With HBNB_FILE_JOURNAL=1, save() appends one JSON line per object
+    changed since the last save to a journal next to the JSON file instead
+    of rewriting the whole file; reload() replays the journal on top of the
+    snapshot and the journal is folded back into the snapshot once it holds
+    more than HBNB_FILE_JOURNAL_MAX records.
+
+    HBNB_FILE_FLUSH_MS and HBNB_FILE_FLUSH_COUNT turn save() into a group
+    commit: changes are written at most every N milliseconds or once K of
+    them are pending, whichever comes first, and flush() writes them now.
+
+    reload() keeps the records it reads as plain dictionaries and only
+    builds model instances when get() or all() asks for them; records that
+    were never touched are written back as they were read.
+
+    HBNB_FILE_FORMAT=binary keeps the snapshot in file.bin, in the format of
+    models.engine.binary_format, instead of file.json. Its records are kept
+    packed, as bytes, and are only decoded when an instance is built from
+    one or an index of its class is first needed; until then they are in
+    no index.
+
+    For every attribute in foreign_keys a reverse index maps a parent id to
+    the keys of the objects pointing at it; related() answers from it.
+    page() walks a class in (created_at, id) order from a sorted index that
+    is built on its first use and kept up to date from then on; the range
+    and sort of search_places() use sorted indexes of the place fields
+    they name, built the same way. An inverted index files every place
+    under its amenity_ids, so that search_places() intersects sets of keys
+    instead of looking at places, and a grid index built on first use
+    files them by location for places_near() and bounded searches. The
+    full-text index of search_text() is also built on first use, then
+    follows new(), delete() and reload().
 
+    Writers (new, delete, reload, save and building instances) serialize on
+    one lock. Readers never take it: get() is a dictionary lookup, all(cls)
+    returns a copy, and all() returns a copy of __objects that is shared
+    until the next write, so it must be treated as read-only.
+    """
+
+    # boolean - keep the snapshot in the binary format instead of JSON
+    __binary = os.getenv("HBNB_FILE_FORMAT", "json").lower() == "binary"
     # string - path to the JSON file
-    __file_path = "file.json"
+    __file_path = "file.bin" if __binary else "file.json"
+    # string - path to the append-only journal of changes since the snapshot
+    __journal_path = __file_path + ".journal"
+    # boolean - append changes to the journal instead of rewriting the file
+    __journal = os.getenv("HBNB_FILE_JOURNAL", "0").lower() in ("1", "true")
+    # integer - number of journal records that triggers a compaction
+    __journal_max = int(os.getenv("HBNB_FILE_JOURNAL_MAX", "1000"))
+    # integer - milliseconds a save() may wait for others to join it
+    __flush_ms = int(os.getenv("HBNB_FILE_FLUSH_MS", "0"))
+    # integer - number of pending changes that forces a flush
+    __flush_count = int(os.getenv("HBNB_FILE_FLUSH_COUNT", "0"))
+    # lock - serializes writers; readers never wait for it
+    __lock = threading.RLock()
+    # Timer - pending delayed flush, if any
+    __flush_timer = None
+    # float - time.monotonic() of the last flush
+    __last_flush = 0.0
+    # boolean - whether pending changes get flushed at interpreter exit
+    __flush_at_exit = False
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - <class name> -> {<class name>.id: obj}, mirrors __objects
+    __index = {}
+    # dictionary - <class name> -> {<class name>.id: record} not yet built,
+    # a dictionary or the packed bytes of a binary record
+    __raw = {}
+    # set - class names that may have packed records in __raw
+    __packed = set()
+    # dictionary - <class name> -> number of its objects, built or not
+    __counts = {}
+    # integer - bumped after every change to __objects
+    __version = 0
+    # tuple - (__version, copy of __objects) handed out by all()
+    __snapshot = (-1, None)
+    # dictionary - (<class name>, foreign key) -> {parent id: {key: None}}
+    __fk_index = {}
+    # dictionary - (<class name>, attribute) -> SortedIndex of keys by the
+    # sort_value() of that attribute
+    __sorted = {}
+    # InvertedIndex - Place.id keys by amenity id
+    __amenities = InvertedIndex()
+    # GridIndex - Place.id keys by (latitude, longitude), None until used
+    __grid = None
+    # TextIndex - keys by the terms of their TEXT_FIELDS, None until used
+    __text = None
+    # dictionary - <class name> -> (position of the files when its last
+    # change was written or read, datetime of the files then)
+    __versions = {}
+    # dictionary - <class name> -> (number of changes, datetime of the last)
+    # this process made or read
+    __changes = {}
+    # set - class names changed since the position of the files was noted
+    __touched = set()
+    # string - tells unsaved changes of this process from other processes'
+    __epoch = "{:x}".format(time.time_ns())
+    # dictionary - <class name>.id -> obj (None if deleted) since last save
+    __dirty = {}
+    # tuple - (inode, size, mtime) of __file_path when last read or written
+    __stamp = None
+    # tuple - (inode, bytes read, records read) of the journal
+    __journal_pos = None
+
+    def all(self, cls=None, load=None):
+        """returns the dictionary __objects
+
+        load names relationship properties of cls; the objects they
+        return are built up front, so reading them is only index lookups.
+        """
+        if cls is not None:
+            name = self.__class_name(cls)
+            self.__hydrate(name)
+            self.__eager(name, load)
+            return dict(self.__index.get(name, {}))
+        self.__hydrate()
+        version, snapshot = self.__snapshot
+        if version != self.__version:
+            version = self.__version
+            snapshot = dict(self.__objects)
+            FileStorage.__snapshot = (version, snapshot)
+        return snapshot
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def iter_all(self, cls=None, load=None):
+        """yields the objects of class cls (or of every class) one at a
+        time, building each from its record only when it is reached;
+        load is as for all()"""
+        names = list(classes) if cls is None else [self.__class_name(cls)]
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+            self.__eager(names[0], load)
+        for name in names:
+            # records first: one built meanwhile is already in the index
+            unbuilt = list(self.__raw.get(name, {}))
+            keys = dict.fromkeys(list(self.__index.get(name, {})))
+            keys.update(dict.fromkeys(unbuilt))
+            for key in keys:
+                obj = self.__lookup(name, key)
+                if obj is not None:
+                    yield obj
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock:
+                self.__put(key, obj)
+                self.__dirty[key] = obj
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path)
+
+        Without a group-commit policy this writes immediately; otherwise
+        the write is deferred until the policy says enough time has passed
+        or enough changes are pending.
+        """
+        with self.__lock:
+            if self.__flush_ms <= 0 and self.__flush_count <= 0:
+                self.flush()
+                return
+            if not self.__dirty:
+                return
+            if 0 < self.__flush_count <= len(self.__dirty):
+                self.flush()
+                return
+            if self.__flush_ms > 0:
+                wait = (self.__last_flush + self.__flush_ms / 1000.0 -
+                        time.monotonic())
+                if wait <= 0:
+                    self.flush()
+                    return
+                if self.__flush_timer is None:
+                    timer = threading.Timer(wait, self.flush)
+                    timer.daemon = True
+                    timer.start()
+                    FileStorage.__flush_timer = timer
+            if not self.__flush_at_exit:
+                atexit.register(self.__flush_pending)
+                FileStorage.__flush_at_exit = True
+
+    def flush(self):
+        """writes every change pending since the last flush to disk"""
+        with self.__lock:
+            if self.__flush_timer is not None:
+                self.__flush_timer.cancel()
+                FileStorage.__flush_timer = None
+            self.__touched.update(key.partition(".")[0]
+                                  for key in self.__dirty)
+            if self.__journal:
+                self.__append_journal()
+                if self.__journal_pos[2] > self.__journal_max:
+                    self.__write_snapshot()
+                    open(self.__journal_path, 'w').close()
+                    FileStorage.__journal_pos = self.__journal_stamp(0, 0)
+            else:
+                self.__write_snapshot()
+            self.__settle()
+            FileStorage.__last_flush = time.monotonic()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
-        try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except:
-            pass
+        """deserializes the JSON file to __objects
+
+        The file is only parsed again when its inode, size or mtime differ
+        from what was last read or written, so repeated reloads of an
+        unchanged file are a single stat() call. In journal mode only the
+        journal records appended since the last reload are replayed.
+        """
+        stamp = self.__file_stamp()
+        if stamp is not None and stamp != self.__stamp:
+            with self.__lock:
+                if stamp != self.__stamp:
+                    self.__read_snapshot(stamp)
+        if self.__journal:
+            with self.__lock:
+                self.__replay_journal()
+        if self.__touched:
+            with self.__lock:
+                self.__settle()
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock:
+                if key in self.__objects or \
+                   key in self.__raw.get(obj.__class__.__name__, {}):
+                    self.__remove(key)
+                    self.__dirty[key] = None
 
     def close(self):
         """call reload() method for deserializing the JSON file to objects"""
@@ -71,27 +335,678 @@ class FileStorage:
 
     def get(self, cls, id):
         '''method to retrieve one object with spacific id'''
-        if cls:
-            if isinstance(cls, str):
-                cls = classes.get(cls, None)
-            if cls not in classes.values():
-                return None
-            for obj in self.__objects.values():
-                if ((cls == obj.__class__ or cls == obj.__class__.__name__) and (obj.id == id)):
-                    return (obj)
-        return None
+        name = self.__class_name(cls)
+        if name not in classes:
+            return None
+        return self.__lookup(name, name + "." + str(id))
 
     def count(self, cls=None):
         '''method to count the number of objects in storage'''
         if cls:
-            cnt = 0
-            if isinstance(cls, str):
-                cls = classes.get(cls, None)
-            if cls not in classes.values():
+            name = self.__class_name(cls)
+            if name not in classes:
                 return 0
-            for obj in self.__objects.values():
-                if cls == obj.__class__ or cls == obj.__class__.__name__:
-                    cnt += 1
-            return cnt
+            return self.__counts.get(name, 0)
+        else:
+            return sum(list(self.__counts.values()))
+
+    def counts(self):
+        """returns {<class name>: number of objects} for every class
+
+        The counts are kept as objects are added and removed, not as
+        records are built, so this never looks at the objects and a
+        reader never sees one uncounted while it is being built.
+        """
+        return {name: self.__counts.get(name, 0) for name in classes}
+
+    def version(self, cls):
+        """returns (tag, datetime or None) for the objects of class cls:
+        the tag changes whenever one of them is added, changed or deleted,
+        and no change was made after the datetime
+
+        Once its changes are saved, a class is tagged with the position of
+        the snapshot and journal its last change was written to or read
+        from, which every process reading the same files agrees on, and
+        dated with their mtime. Until then it is tagged with a counter of
+        the changes this process made.
+        """
+        name = self.__class_name(cls)
+        prefix = name + "."
+        if any(key.startswith(prefix) for key in list(self.__dirty)):
+            changes, when = self.__changes[name]
+            return "{}-{}".format(self.__epoch, changes), when
+        return self.__versions.get(name, ("0", None))
+
+    def filter(self, cls, load=None, **criteria):
+        """returns the cls objects matching every criterion, keyed like
+        all(); see models.engine.query for the criteria syntax, and all()
+        for load
+
+        Equality and membership tests on a foreign key are answered from
+        the reverse index; the other criteria are checked on its result,
+        or on every object of the class when no index applies.
+        """
+        name = self.__class_name(cls)
+        self.__eager(name, load)
+        predicates = parse_criteria(criteria)
+        keys = None
+        for attr, op, operand in predicates:
+            if attr in foreign_keys and op in ("eq", "in"):
+                self.__unpack(name)
+                children = self.__fk_index.get((name, attr), {})
+                found = set()
+                for parent_id in ([operand] if op == "eq" else operand):
+                    found.update(list(children.get(parent_id, ())))
+                keys = found if keys is None else keys & found
+        if keys is None:
+            candidates = self.all(name).items()
         else:
-            return (len(self.__objects))
+            candidates = ((key, self.__lookup(name, key)) for key in keys)
+        return {key: obj for key, obj in candidates
+                if obj is not None and matches(obj, predicates)}
+
+    def find_one(self, cls, **criteria):
+        """returns one cls object matching every criterion, or None"""
+        for obj in self.filter(cls, **criteria).values():
+            return obj
+        return None
+
+    def page(self, cls, limit, cursor=None, **criteria):
+        """returns (up to limit cls objects, cursor of the next page or
+        None), walking the objects matching criteria in (created_at, id)
+        order from the page cursor names; raises ValueError for a cursor
+        that does not parse"""
+        name = self.__class_name(cls)
+        if criteria:
+            return page_of(self.filter(name, **criteria).values(), limit,
+                           cursor)
+        position = None
+        if cursor is not None:
+            created, oid = parse_cursor(cursor)
+            position = (created, name + "." + oid)
+        order = self.__sorted_index(name, "created_at")
+        objs = [obj for obj in (self.__lookup(name, key) for key in
+                                order.after(position, limit + 1))
+                if obj is not None]
+        if len(objs) > limit:
+            return objs[:limit], cursor_of(objs[limit - 1])
+        return objs, None
+
+    def search_places(self, states=(), cities=(), amenities=(), ranges=None,
+                      bounds=None, sort=None, limit=None, cursor=None):
+        """returns (places, cursor of the next page or None) for a places
+        search; see models.engine.search
+
+        The candidate keys are the union of the reverse index entries of
+        the cities, intersected with the amenity postings, the slices of
+        the sorted indexes within the ranges and the grid cells within
+        bounds; only the places left are built or looked at. A sorted
+        search picks its page from the candidates when they are few, and
+        otherwise walks the sorted index of the field from the cursor
+        until the page is full; a paged search without sort walks the
+        created_at index the same way.
+        """
+        keys = None
+        self.__unpack("Place")
+        if states or cities:
+            self.__unpack("City")
+            city_ids = set(cities)
+            by_state = self.__fk_index.get(("City", "state_id"), {})
+            for state_id in states:
+                city_ids.update(key.partition(".")[2] for key in
+                                list(by_state.get(state_id, ())))
+            by_city = self.__fk_index.get(("Place", "city_id"), {})
+            keys = set()
+            for city_id in city_ids:
+                keys.update(list(by_city.get(city_id, ())))
+        wanted = set(amenities)
+        if wanted:
+            if any(self.get("Amenity", amenity_id) is None
+                   for amenity_id in wanted):
+                keys = set()
+            elif keys is None or keys:
+                found = self.__amenities.intersection(wanted)
+                keys = found if keys is None else keys & found
+        for attr, (low, high) in (ranges or {}).items():
+            index = self.__sorted_index("Place", attr)
+            if keys is not None and len(keys) * 8 < len(index):
+                keys = {key for key in keys
+                        if in_range(index.get(key), low, high)}
+            elif keys is None or keys:
+                found = set(index.between(low, high))
+                keys = found if keys is None else keys & found
+        if bounds is not None:
+            grid = self.__place_grid()
+            if keys is not None and len(keys) * 8 < len(grid):
+                keys = {key for key in keys if grid.get(key) is not None and
+                        in_box(*grid.get(key), box=bounds)}
+            elif keys is None or keys:
+                found = set(grid.within(bounds))
+                keys = found if keys is None else keys & found
+        if sort is not None:
+            return self.__sorted_places(keys, sort, limit, cursor)
+        if limit is not None:
+            index = self.__sorted_index("Place", "created_at")
+            if keys is None or len(keys) * 8 >= len(index):
+                return self.__created_places(index, keys, limit, cursor)
+        if keys is None:
+            places = self.iter_all("Place")
+        else:
+            places = [place for place in (self.__lookup("Place", key)
+                                          for key in keys)
+                      if place is not None]
+        if limit is None:
+            return places, None
+        return page_of(places, limit, cursor)
+
+    def places_near(self, lat, lng, radius, limit=None):
+        """returns [(distance, place)] for the places within radius
+        kilometres of (lat, lng), nearest first; see models.engine.search
+
+        Only the places of the grid cells around the point are looked at.
+        """
+        found = []
+        for away, key in self.__place_grid().nearest(lat, lng, radius,
+                                                     limit):
+            place = self.__lookup("Place", key)
+            if place is not None:
+                found.append((away, place))
+        return found
+
+    def search_text(self, query, limit=None, cursor=None):
+        """returns ([(score, object)], cursor of the next page or None) for
+        a full-text search; see models.engine.search
+
+        Only the postings of the terms of query are read, and only the
+        objects of the page are built.
+        """
+        return text_page(self.__text_index(), query,
+                         lambda key: self.__lookup(key.partition(".")[0],
+                                                   key),
+                         limit, cursor)
+
+    def related(self, cls, attr, parent_id):
+        """returns the cls objects whose foreign key attr is parent_id"""
+        name = self.__class_name(cls)
+        self.__unpack(name)
+        keys = self.__fk_index.get((name, attr), {}).get(parent_id, ())
+        return [obj for obj in (self.__lookup(name, key) for key in
+                                list(keys)) if obj is not None]
+
+    def reindex(self, obj, attr, old):
+        """moves obj in the reverse index after its foreign key attr
+        changed from old, or in the amenity index after its amenity_ids
+        changed"""
+        if attr not in foreign_keys and attr != "amenity_ids":
+            return
+        name = obj.__class__.__name__
+        key = name + "." + obj.id
+        with self.__lock:
+            if self.__objects.get(key) is not obj:
+                return
+            if attr == "amenity_ids":
+                if name == "Place":
+                    self.__amenities.add(key, obj.amenity_ids)
+                return
+            children = self.__fk_index.setdefault((name, attr), {})
+            children.get(old, {}).pop(key, None)
+            children.setdefault(getattr(obj, attr), {})[key] = None
+
+    def __read_snapshot(self, stamp):
+        """loads the records of the snapshot file taken at stamp"""
+        try:
+            if self.__binary:
+                with open(self.__file_path, 'rb') as f:
+                    self.__put_packed(binary_format.records(f))
+            else:
+                with open(self.__file_path, 'r') as f:
+                    for key, record in iter_json_items(f):
+                        self.__put_record(key, record)
+            FileStorage.__stamp = stamp
+            FileStorage.__journal_pos = None
+        except:
+            pass
+
+    def __flush_pending(self):
+        """flushes changes still waiting for a group commit"""
+        if self.__dirty:
+            self.flush()
+
+    def __lookup(self, name, key):
+        """returns the object of class name stored under key, building it
+        from its record if needed"""
+        obj = self.__index.get(name, {}).get(key)
+        if obj is None:
+            if key in self.__raw.get(name, {}):
+                with self.__lock:
+                    record = self.__raw.get(name, {}).get(key)
+                    if record is not None:
+                        self.__build(name, key, record)
+            # a build publishes the instance before dropping the record
+            obj = self.__index.get(name, {}).get(key)
+        return obj
+
+    def __build(self, name, key, record):
+        """replaces the record stored under key by its instance"""
+        obj = self.__instance(name, key, record)
+        self.__objects[key] = obj
+        self.__index.setdefault(name, {})[key] = obj
+        self.__raw[name].pop(key, None)
+        FileStorage.__version += 1
+
+    def __instance(self, name, key, record):
+        """returns the instance of the record stored under key, indexing
+        the record first if it was still packed"""
+        if isinstance(record, bytes):
+            record = binary_format.unpack(record, name)
+            self.__index_fields(name, key, record)
+        return classes[name](**record)
+
+    def __put(self, key, obj):
+        """stores obj under key in __objects and the indexes"""
+        name = obj.__class__.__name__
+        old = self.__objects.get(key)
+        self.__objects[key] = obj
+        self.__index.setdefault(name, {})[key] = obj
+        if old is not None:
+            self.__unindex_fields(old.__class__.__name__, key, old.__dict__)
+        else:
+            record = self.__raw.get(name, {}).pop(key, None)
+            if isinstance(record, dict):
+                self.__unindex_fields(name, key, record)
+            elif record is None:
+                self.__counts[name] = self.__counts.get(name, 0) + 1
+        self.__index_fields(name, key, obj.__dict__)
+        FileStorage.__version += 1
+        self.__changed(name)
+
+    def __put_record(self, key, record):
+        """stores a record read from disk, to be built on first use"""
+        name = record["__class__"]
+        if name not in classes:
+            raise KeyError(name)
+        # each decode has its own key memo, so share attribute names here
+        record = {intern(k): v for k, v in record.items()}
+        self.__store_raw(name, key, record)
+        self.__index_fields(name, key, record)
+        self.__changed(name)
+
+    def __store_raw(self, name, key, record):
+        """files record under key in __raw in place of what key held, so
+        that readers find one or the other throughout"""
+        records = self.__raw.setdefault(name, {})
+        old = records.get(key)
+        if isinstance(old, dict):
+            self.__unindex_fields(name, key, old)
+        records[key] = record
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            self.__index.get(name, {}).pop(key, None)
+            self.__unindex_fields(name, key, obj.__dict__)
+            FileStorage.__version += 1
+        elif old is None:
+            self.__counts[name] = self.__counts.get(name, 0) + 1
+
+    def __put_packed(self, records):
+        """stores the (key, packed bytes) of binary records read from disk,
+        to be decoded on first use"""
+        raw = {}
+        for key, data in records:
+            name = key.partition(".")[0]
+            packed = raw.get(name)
+            if packed is None:
+                if name not in classes:
+                    raise KeyError(name)
+                packed = raw[name] = self.__raw.setdefault(name, {})
+                self.__packed.add(name)
+                self.__changed(name)
+            if key in packed or key in self.__objects:
+                self.__store_raw(name, key, data)
+            else:
+                packed[key] = data
+                self.__counts[name] = self.__counts.get(name, 0) + 1
+
+    def __unpack(self, name):
+        """decodes the packed records of class name, adding them to the
+        indexes"""
+        if name not in self.__packed:
+            return
+        with self.__lock:
+            records = self.__raw.get(name, {})
+            for key, record in list(records.items()):
+                if isinstance(record, bytes):
+                    record = binary_format.unpack(record, name)
+                    records[key] = record
+                    self.__index_fields(name, key, record)
+            self.__packed.discard(name)
+
+    def __remove(self, key):
+        """drops key from __objects, the indexes and unbuilt records"""
+        name = key.partition(".")[0]
+        record = self.__raw.get(name, {}).pop(key, None)
+        if isinstance(record, dict):
+            self.__unindex_fields(name, key, record)
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            name = obj.__class__.__name__
+            self.__index.get(name, {}).pop(key, None)
+            self.__unindex_fields(name, key, obj.__dict__)
+            FileStorage.__version += 1
+        if record is not None or obj is not None:
+            self.__counts[name] = self.__counts.get(name, 1) - 1
+            self.__changed(name)
+
+    def __changed(self, name):
+        """counts a change to the objects of class name"""
+        changes = self.__changes.get(name, (0, None))[0]
+        self.__changes[name] = (changes + 1, datetime.utcnow())
+        self.__touched.add(name)
+
+    def __settle(self):
+        """notes the position of the files as the version of the classes
+        changed since it was last noted"""
+        position = "{}:{}".format(self.__stamp, self.__journal_pos and
+                                  self.__journal_pos[:2])
+        mtime = self.__stamp[2] if self.__stamp is not None else None
+        if self.__journal:
+            try:
+                mtime = max(mtime or 0,
+                            os.stat(self.__journal_path).st_mtime_ns)
+            except OSError:
+                pass
+        when = None
+        if mtime is not None:
+            when = datetime.utcfromtimestamp(mtime / 1e9)
+        for name in self.__touched:
+            self.__versions[name] = (position, when)
+        self.__touched.clear()
+
+    def __sorted_places(self, keys, sort, limit, cursor):
+        """returns (up to limit places of keys, or of every place when keys
+        is None, cursor of the next page or None) in the order sort names;
+        see models.engine.search"""
+        attr, descending = sort
+        index = self.__sorted_index("Place", attr)
+        position = None
+        if cursor is not None:
+            value, oid = parse_sort_cursor(cursor)
+            position = (value, "Place." + oid)
+        if keys is not None and len(keys) * 8 < len(index):
+            entries = ((index.get(key), key) for key in keys)
+            entries = top_of((e for e in entries if e[0] is not None),
+                             limit, position, descending)
+        else:
+            entries = (e for e in index.walk(position, descending)
+                       if keys is None or e[1] in keys)
+        places = []
+        for value, key in entries:
+            place = self.__lookup("Place", key)
+            if place is not None:
+                places.append(place)
+                if limit is not None and len(places) > limit:
+                    return places[:limit], sort_cursor_of(places[limit - 1],
+                                                          attr)
+        return places, None
+
+    def __created_places(self, index, keys, limit, cursor):
+        """returns (up to limit places of keys, or of every place when keys
+        is None, cursor of the next page or None) in (created_at, id)
+        order, walking the created_at index from the page cursor"""
+        position = None
+        if cursor is not None:
+            created, oid = parse_cursor(cursor)
+            position = (created, "Place." + oid)
+        places = []
+        for value, key in index.walk(position):
+            if keys is not None and key not in keys:
+                continue
+            place = self.__lookup("Place", key)
+            if place is not None:
+                places.append(place)
+                if len(places) > limit:
+                    return places[:limit], cursor_of(places[limit - 1])
+        return places, None
+
+    def __sorted_index(self, name, attr):
+        """returns the SortedIndex of the objects of class name by attr,
+        building it on first use"""
+        self.__unpack(name)
+        index = self.__sorted.get((name, attr))
+        if index is None:
+            with self.__lock:
+                index = self.__sorted.get((name, attr))
+                if index is None:
+                    index = SortedIndex(self.__sort_values(name, attr))
+                    self.__sorted[(name, attr)] = index
+        return index
+
+    def __place_grid(self):
+        """returns the GridIndex of the places, building it on first use"""
+        self.__unpack("Place")
+        grid = self.__grid
+        if grid is None:
+            with self.__lock:
+                grid = self.__grid
+                if grid is None:
+                    grid = GridIndex(self.__locations())
+                    FileStorage.__grid = grid
+        return grid
+
+    def __text_index(self):
+        """returns the TextIndex of the TEXT_FIELDS, building it on first
+        use"""
+        for name in TEXT_FIELDS:
+            self.__unpack(name)
+        text = self.__text
+        if text is None:
+            with self.__lock:
+                text = self.__text
+                if text is None:
+                    text = TextIndex(self.__texts())
+                    FileStorage.__text = text
+        return text
+
+    def __texts(self):
+        """yields (key, text) for the objects whose TEXT_FIELDS attribute
+        holds text"""
+        for name, attr in TEXT_FIELDS.items():
+            for key, fields in self.__fields_of(name):
+                if isinstance(fields.get(attr), str):
+                    yield key, fields[attr]
+
+    def __locations(self):
+        """yields (key, (latitude, longitude)) for the places that have
+        one"""
+        for key, fields in self.__fields_of("Place"):
+            point = coordinates(fields.get("latitude"),
+                                fields.get("longitude"))
+            if point is not None:
+                yield key, point
+
+    def __sort_values(self, name, attr):
+        """yields (key, sort_value() of attr) for the objects of class name
+        that have one"""
+        for key, fields in self.__fields_of(name):
+            value = sort_value(attr, self.__field(name, fields, attr))
+            if value is not None:
+                yield key, value
+
+    def __fields_of(self, name):
+        """yields (key, attribute dictionary) for the objects and unpacked
+        records of class name, the ones the indexes hold"""
+        for objs in (self.__index.get(name, {}), self.__raw.get(name, {})):
+            for key, fields in list(objs.items()):
+                if isinstance(fields, bytes):
+                    continue
+                if not isinstance(fields, dict):
+                    fields = fields.__dict__
+                yield key, fields
+
+    def __index_fields(self, name, key, fields):
+        """adds key to the secondary indexes for its fields"""
+        for attr in foreign_keys:
+            if attr in fields:
+                self.__fk_index.setdefault((name, attr), {}).setdefault(
+                    fields[attr], {})[key] = None
+        for (n, attr), index in list(self.__sorted.items()):
+            if n == name:
+                value = sort_value(attr, self.__field(name, fields, attr))
+                if value is not None:
+                    index.add(key, value)
+        if name == "Place" and fields.get("amenity_ids"):
+            self.__amenities.add(key, fields["amenity_ids"])
+        if name == "Place" and self.__grid is not None:
+            point = coordinates(fields.get("latitude"),
+                                fields.get("longitude"))
+            if point is not None:
+                self.__grid.add(key, *point)
+        attr = TEXT_FIELDS.get(name)
+        if attr is not None and self.__text is not None and \
+           isinstance(fields.get(attr), str):
+            self.__text.add(key, fields[attr])
+
+    def __unindex_fields(self, name, key, fields):
+        """removes key from the secondary indexes for its fields"""
+        for attr in foreign_keys:
+            if attr in fields:
+                self.__fk_index.get((name, attr), {}).get(
+                    fields[attr], {}).pop(key, None)
+        for (n, attr), index in list(self.__sorted.items()):
+            if n == name:
+                index.discard(key)
+        if name == "Place":
+            self.__amenities.discard(key)
+            if self.__grid is not None:
+                self.__grid.discard(key)
+        if name in TEXT_FIELDS and self.__text is not None:
+            self.__text.discard(key)
+
+    def __eager(self, name, load):
+        """builds the objects the relationships of class name listed in
+        load return, or raises ValueError for a name that is not one"""
+        for rel in load or ():
+            if rel not in relations or not isinstance(
+                    getattr(classes.get(name), rel, None), property):
+                raise ValueError("{} has no relationship {}".format(name,
+                                                                    rel))
+            self.__hydrate(relations[rel])
+
+    def __hydrate(self, name=None):
+        """builds the instances of class name (or of every class) not
+        built yet from their records"""
+        names = list(self.__raw) if name is None else [name]
+        if not any(self.__raw.get(n) for n in names):
+            return
+        with self.__lock:
+            for n in names:
+                records = self.__raw.get(n)
+                if not records:
+                    continue
+                built = {key: self.__instance(n, key, record)
+                         for key, record in list(records.items())}
+                # publish before dropping the records, so that readers
+                # find every key in one place or the other
+                self.__objects.update(built)
+                self.__index.setdefault(n, {}).update(built)
+                for key in built:
+                    records.pop(key, None)
+                FileStorage.__version += len(built)
+
+    def __write_snapshot(self):
+        """rewrites the JSON file with every object in __objects"""
+        json_objects = {}
+        for name, records in self.__raw.items():
+            json_objects.update(records)
+            if records:
+                self.__touched.add(name)
+        for key in self.__objects:
+            json_objects[key] = self.__objects[key].to_dict()
+        self.__touched.update(name for name, objs in self.__index.items()
+                              if objs)
+        tmp_path = self.__file_path + ".tmp"
+        if self.__binary:
+            with open(tmp_path, 'wb') as f:
+                binary_format.dump(json_objects.items(), f, list(classes))
+        else:
+            with open(tmp_path, 'w') as f:
+                json.dump(json_objects, f)
+        os.replace(tmp_path, self.__file_path)
+        FileStorage.__stamp = self.__file_stamp()
+        self.__dirty.clear()
+
+    def __append_journal(self):
+        """appends one record per object changed since the last save"""
+        if self.__journal_pos is None:
+            self.__replay_journal()
+        if self.__dirty:
+            lines = []
+            for key, obj in self.__dirty.items():
+                record = {"key": key,
+                          "obj": obj.to_dict() if obj is not None else None}
+                lines.append(json.dumps(record, separators=(',', ':')))
+            with open(self.__journal_path, 'a') as f:
+                f.write("\n".join(lines) + "\n")
+                size = f.tell()
+            FileStorage.__journal_pos = self.__journal_stamp(
+                size, self.__journal_pos[2] + len(lines))
+            self.__dirty.clear()
+
+    def __replay_journal(self):
+        """applies the journal records appended since the last replay"""
+        pos = self.__journal_pos
+        try:
+            st = os.stat(self.__journal_path)
+        except OSError:
+            FileStorage.__journal_pos = (None, 0, 0)
+            return
+        if pos is None or pos[0] != st.st_ino or pos[1] > st.st_size:
+            pos = (st.st_ino, 0, 0)
+        offset, records = pos[1], pos[2]
+        with open(self.__journal_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                offset += len(line)
+                records += 1
+                key, jo = record["key"], record["obj"]
+                if jo is None:
+                    self.__remove(key)
+                else:
+                    self.__put_record(key, jo)
+        FileStorage.__journal_pos = (st.st_ino, offset, records)
+
+    def __journal_stamp(self, size, records):
+        """returns the journal position after writing it up to size"""
+        try:
+            inode = os.stat(self.__journal_path).st_ino
+        except OSError:
+            inode = None
+        return (inode, size, records)
+
+    def __file_stamp(self):
+        """returns (inode, size, mtime) of __file_path or None if missing"""
+        try:
+            st = os.stat(self.__file_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def __field(name, fields, attr):
+        """returns attr of the fields of an object of class name, or the
+        class default it reads when the fields leave attr out"""
+        if attr in fields:
+            return fields[attr]
+        return getattr(classes.get(name), attr, None)
+
+    @staticmethod
+    def __class_name(cls):
+        """returns the class name for a class or a class name string"""
+        if cls is None or isinstance(cls, str):
+            return cls
+        return cls.__name__
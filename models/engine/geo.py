@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Contains the great-circle helpers of the location searches
+
+Points are (latitude, longitude) in degrees and distances are in
+kilometres. A box is (south, west, north, east); west is greater than
+east when the box crosses the antimeridian.
+"""
+
+from math import asin, cos, degrees, radians, sin, sqrt
+
+# float - mean radius of the Earth, in kilometres
+EARTH_RADIUS = 6371.0088
+
+
+def distance(lat1, lng1, lat2, lng2):
+    """returns the great-circle distance between two points"""
+    dlat = radians(lat2 - lat1)
+    dlng = radians(lng2 - lng1)
+    h = (sin(dlat / 2) ** 2 +
+         cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng / 2) ** 2)
+    return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(h)))
+
+
+def bounding_box(lat, lng, radius):
+    """returns the smallest box holding every point within radius of
+    (lat, lng)"""
+    angle = radius / EARTH_RADIUS
+    south, north = lat - degrees(angle), lat + degrees(angle)
+    if south <= -90 or north >= 90 or angle >= 1.5707963:
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+    dlng = degrees(asin(min(1.0, sin(angle) / cos(radians(lat)))))
+    if dlng >= 180:
+        return south, -180.0, north, 180.0
+    west, east = lng - dlng, lng + dlng
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+
+def in_box(lat, lng, box):
+    """returns True if the point is inside box"""
+    south, west, north, east = box
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lng <= east
+    return lng >= west or lng <= east
+
+
+def coordinates(lat, lng):
+    """returns (lat, lng) as floats if both are numbers of a valid point,
+    None otherwise"""
+    for value in (lat, lng):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return float(lat), float(lng)
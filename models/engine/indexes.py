@@ -0,0 +1,309 @@
+#!/usr/bin/python3
+"""
+Contains the in-memory secondary indexes used by FileStorage
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+import heapq
+from math import floor, log
+import re
+from models.engine.geo import bounding_box, distance, in_box
+
+# string - sorts after every key, to bound (value, key) searches
+TOP = chr(0x10ffff)
+# regular expression - a term of a text: a run of word characters
+TERM = re.compile(r"\w\w+")
+
+
+def tokenize(text):
+    """returns the list of terms of text, lowercased, in order; single
+    characters are not terms"""
+    return TERM.findall(text.lower())
+
+
+class SortedIndex:
+    """keys kept in (value, key) order, for ordered and range scans
+
+    Adding or discarding a key is a binary search plus a list insert or
+    delete; reading a slice of the order is a binary search plus a copy of
+    the slice.
+    """
+
+    def __init__(self, pairs=()):
+        """builds the index from (key, value) pairs"""
+        self.__values = dict(pairs)
+        self.__entries = sorted((value, key) for key, value
+                                in self.__values.items())
+
+    def __len__(self):
+        """returns the number of keys in the index"""
+        return len(self.__entries)
+
+    def add(self, key, value):
+        """files key under value, replacing its previous value"""
+        self.discard(key)
+        self.__values[key] = value
+        insort(self.__entries, (value, key))
+
+    def discard(self, key):
+        """removes key from the index if it is there"""
+        if key not in self.__values:
+            return
+        entry = (self.__values.pop(key), key)
+        i = bisect_left(self.__entries, entry)
+        if i < len(self.__entries) and self.__entries[i] == entry:
+            del self.__entries[i]
+
+    def get(self, key):
+        """returns the value key is filed under, or None"""
+        return self.__values.get(key)
+
+    def between(self, low=None, high=None):
+        """returns the keys whose value is at least low and at most high,
+        in order; None leaves that end open"""
+        start = 0 if low is None else bisect_left(self.__entries, (low,))
+        stop = None if high is None else bisect_right(self.__entries,
+                                                      (high, TOP))
+        return [key for value, key in self.__entries[start:stop]]
+
+    def walk(self, position=None, reverse=False, chunk=256):
+        """yields the (value, key) entries after position (before it when
+        reverse), in order, copying chunk entries at a time so writers can
+        go on meanwhile"""
+        while True:
+            entries = self.__entries
+            if reverse:
+                stop = len(entries) if position is None else \
+                    bisect_left(entries, position)
+                part = entries[max(stop - chunk, 0):stop][::-1]
+            else:
+                start = 0 if position is None else \
+                    bisect_right(entries, position)
+                part = entries[start:start + chunk]
+            if not part:
+                return
+            for entry in part:
+                yield entry
+            position = part[-1]
+
+    def after(self, position=None, limit=None):
+        """returns up to limit keys whose (value, key) comes after position,
+        or from the start when position is None"""
+        start = 0 if position is None else bisect_right(self.__entries,
+                                                        position)
+        stop = None if limit is None else start + limit
+        return [key for value, key in self.__entries[start:stop]]
+
+
+class InvertedIndex:
+    """keys filed under each of their terms, so that the keys having
+    every one of several terms come from intersecting their postings
+
+    Each key's terms are remembered, so add() and discard() undo exactly
+    what was filed even if the caller's list changed since.
+    """
+
+    def __init__(self):
+        """builds an empty index"""
+        # dictionary - term -> set of keys
+        self.__postings = {}
+        # dictionary - key -> frozenset of its terms
+        self.__terms = {}
+
+    def __len__(self):
+        """returns the number of keys in the index"""
+        return len(self.__terms)
+
+    def add(self, key, terms):
+        """files key under each of terms, replacing its previous terms"""
+        self.discard(key)
+        terms = frozenset(terms)
+        self.__terms[key] = terms
+        for term in terms:
+            self.__postings.setdefault(term, set()).add(key)
+
+    def discard(self, key):
+        """removes key from the index if it is there"""
+        for term in self.__terms.pop(key, ()):
+            keys = self.__postings.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.__postings[term]
+
+    def intersection(self, terms):
+        """returns the set of keys filed under every one of terms,
+        intersecting the shortest postings first"""
+        postings = sorted((self.__postings.get(term, set())
+                           for term in set(terms)), key=len)
+        if not postings:
+            return set()
+        keys = set(postings[0])
+        for other in postings[1:]:
+            if not keys:
+                break
+            keys &= other
+        return keys
+
+
+class GridIndex:
+    """keys of points filed by the cell of a grid of cell degrees they
+    fall in, for box and radius searches
+
+    A search only looks at the points of the cells its box overlaps, so
+    its cost follows the number of points nearby rather than the total.
+    """
+
+    def __init__(self, points=(), cell=0.1):
+        """builds the index from (key, (latitude, longitude)) pairs"""
+        self.__cell = cell
+        # dictionary - key -> (latitude, longitude)
+        self.__points = {}
+        # dictionary - (row, column) -> {key: None}
+        self.__cells = {}
+        for key, (lat, lng) in points:
+            self.add(key, lat, lng)
+
+    def __len__(self):
+        """returns the number of keys in the index"""
+        return len(self.__points)
+
+    def add(self, key, lat, lng):
+        """files key at (lat, lng), moving it if it was filed elsewhere"""
+        self.discard(key)
+        self.__points[key] = (lat, lng)
+        self.__cells.setdefault(self.__cell_of(lat, lng), {})[key] = None
+
+    def discard(self, key):
+        """removes key from the index if it is there"""
+        point = self.__points.pop(key, None)
+        if point is not None:
+            cell = self.__cell_of(*point)
+            keys = self.__cells.get(cell, {})
+            keys.pop(key, None)
+            if not keys:
+                self.__cells.pop(cell, None)
+
+    def get(self, key):
+        """returns the (latitude, longitude) key is filed at, or None"""
+        return self.__points.get(key)
+
+    def within(self, box):
+        """returns the keys whose point is inside box; see
+        models.engine.geo"""
+        south, west, north, east = box
+        rows = range(self.__row(south), self.__row(north) + 1)
+        if west <= east:
+            cols = [range(self.__row(west), self.__row(east) + 1)]
+        else:
+            cols = [range(self.__row(west), self.__row(180) + 1),
+                    range(self.__row(-180), self.__row(east) + 1)]
+        wanted = len(rows) * sum(len(part) for part in cols)
+        if wanted <= len(self.__cells):
+            cells = [self.__cells.get((row, col), {}) for row in rows
+                     for part in cols for col in part]
+        else:
+            cells = [keys for (row, col), keys in list(self.__cells.items())
+                     if row in rows and any(col in part for part in cols)]
+        found = []
+        for keys in cells:
+            for key in list(keys):
+                point = self.__points.get(key)
+                if point is not None and in_box(point[0], point[1], box):
+                    found.append(key)
+        return found
+
+    def nearest(self, lat, lng, radius, limit=None):
+        """returns [(distance, key)] of the keys within radius kilometres
+        of (lat, lng), nearest first, at most limit of them"""
+        found = []
+        for key in self.within(bounding_box(lat, lng, radius)):
+            point = self.__points.get(key)
+            if point is not None:
+                away = distance(lat, lng, point[0], point[1])
+                if away <= radius:
+                    found.append((away, key))
+        if limit is None:
+            return sorted(found)
+        return heapq.nsmallest(limit, found)
+
+    def __row(self, degrees):
+        """returns the grid row (or column) holding degrees"""
+        return int(floor(degrees / self.__cell))
+
+    def __cell_of(self, lat, lng):
+        """returns the (row, column) of the cell holding a point"""
+        return self.__row(lat), self.__row(lng)
+
+
+class TextIndex:
+    """keys of texts by the terms they contain, with the number of times
+    each appears, for BM25 ranked searches
+
+    Scoring a query only reads the postings of its terms, so its cost
+    follows the number of texts containing them rather than the total.
+    """
+
+    def __init__(self, texts=(), k1=1.2, b=0.75):
+        """builds the index from (key, text) pairs; k1 and b are the BM25
+        term frequency saturation and length normalization"""
+        self.__k1 = k1
+        self.__b = b
+        # dictionary - term -> {key: number of times term is in its text}
+        self.__postings = {}
+        # dictionary - key -> (number of terms, frozenset of the terms)
+        self.__texts = {}
+        # integer - number of terms of every text
+        self.__total = 0
+        for key, text in texts:
+            self.add(key, text)
+
+    def __len__(self):
+        """returns the number of keys in the index"""
+        return len(self.__texts)
+
+    def add(self, key, text):
+        """files key under the terms of text, replacing its previous
+        ones"""
+        self.discard(key)
+        terms = tokenize(text)
+        if not terms:
+            return
+        counts = Counter(terms)
+        self.__texts[key] = (len(terms), frozenset(counts))
+        self.__total += len(terms)
+        for term, count in counts.items():
+            self.__postings.setdefault(term, {})[key] = count
+
+    def discard(self, key):
+        """removes key from the index if it is there"""
+        length, terms = self.__texts.pop(key, (0, ()))
+        self.__total -= length
+        for term in terms:
+            keys = self.__postings.get(term)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self.__postings[term]
+
+    def scores(self, query):
+        """returns {key: BM25 score} for the keys whose text contains at
+        least one term of query"""
+        n = len(self.__texts)
+        if not n:
+            return {}
+        average = self.__total / n
+        k1, b = self.__k1, self.__b
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = list(self.__postings.get(term, {}).items())
+            if not postings:
+                continue
+            idf = log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, count in postings:
+                length = self.__texts.get(key, (average,))[0]
+                norm = count + k1 * (1 - b + b * length / average)
+                scores[key] = (scores.get(key, 0.0) +
+                               idf * count * (k1 + 1) / norm)
+        return scores
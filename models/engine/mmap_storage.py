@@ -0,0 +1,263 @@
+#!/usr/bin/python3
+"""
+Contains the MmapStorage class
+"""
+
+from collections.abc import Mapping
+from datetime import datetime
+import mmap
+import os
+from models.engine import binary_format
+from models.engine.file_storage import classes
+from models.engine.query import matches, page_of, parse_criteria
+from models.engine import search
+
+
+class LazyObjects(Mapping):
+    """read-only mapping of <class name>.id to objects built on access"""
+
+    def __init__(self, storage, keys):
+        """keeps the storage to load from and the keys it holds"""
+        self.__storage = storage
+        self.__keys = keys
+
+    def __getitem__(self, key):
+        """builds the object stored under key"""
+        if key not in self.__keys:
+            raise KeyError(key)
+        obj = self.__storage.load(key)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __iter__(self):
+        """iterates over the keys"""
+        return iter(self.__keys)
+
+    def __len__(self):
+        """returns the number of keys"""
+        return len(self.__keys)
+
+    def __contains__(self, key):
+        """tells whether key is in the mapping without building it"""
+        return key in self.__keys
+
+
+class MmapStorage:
+    """serves objects straight from a memory-mapped binary snapshot
+
+    Only a <class name>.id -> (offset, end) index of the snapshot is kept in
+    memory; get() decodes one record and all() returns a mapping that
+    decodes records as they are read. A decoded object is returned again
+    by later lookups until the snapshot is saved or mapped again, so an
+    edit made to it is not lost. Objects passed to new() are held
+    until the next save(), which writes a new snapshot copying untouched
+    records byte for byte. Worker processes mapping the same file share
+    its pages through the page cache.
+    """
+
+    def __init__(self):
+        """Instantiate a MmapStorage object"""
+        self.__file_path = os.getenv("HBNB_MMAP_FILE", "file.bin")
+        # mmap - the mapped snapshot, None while there is no snapshot
+        self.__map = None
+        # list - class names of the snapshot, by tag
+        self.__names = []
+        # dictionary - <class name> -> {<class name>.id: (offset, end)}
+        self.__index = {}
+        # dictionary - <class name> -> {<class name>.id: obj} not saved yet
+        self.__overlay = {}
+        # dictionary - <class name>.id -> obj decoded from the snapshot
+        self.__loaded = {}
+        # tuple - (inode, size, mtime) of the mapped snapshot
+        self.__stamp = None
+        # tuple - (number of new() and delete() calls, datetime of the last)
+        self.__changes = (0, None)
+
+    def all(self, cls=None, load=None):
+        """returns a mapping of <class name>.id to objects; load is
+        accepted for compatibility, related objects are decoded when
+        read"""
+        names = classes if cls is None else [self.__class_name(cls)]
+        keys = set()
+        for name in names:
+            keys.update(self.__index.get(name, ()))
+            keys.update(self.__overlay.get(name, ()))
+        return LazyObjects(self, keys)
+
+    def iter_all(self, cls=None, load=None):
+        """yields the objects of class cls (or of every class), decoding
+        one record at a time"""
+        for obj in self.all(cls).values():
+            yield obj
+
+    def new(self, obj):
+        """holds obj until the next save()"""
+        if obj is not None:
+            name = obj.__class__.__name__
+            key = name + "." + obj.id
+            self.__index.get(name, {}).pop(key, None)
+            self.__loaded.pop(key, None)
+            self.__overlay.setdefault(name, {})[key] = obj
+            self.__changes = (self.__changes[0] + 1, datetime.utcnow())
+
+    def save(self):
+        """writes a new snapshot and maps it"""
+        new_names = list(classes)
+        retag = {tag: new_names.index(name)
+                 for tag, name in enumerate(self.__names)}
+        tmp_path = self.__file_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            binary_format.dump((), f, new_names)
+            for records in self.__index.values():
+                for offset, end in records.values():
+                    record = self.__map[offset:end]
+                    tag = record[4]
+                    if retag[tag] != tag:
+                        record = bytearray(record)
+                        record[4] = retag[tag]
+                    f.write(record)
+            for name, objs in self.__overlay.items():
+                for obj in objs.values():
+                    f.write(binary_format.encode(new_names.index(name),
+                                                 obj.to_dict()))
+        os.replace(tmp_path, self.__file_path)
+        self.__overlay = {}
+        self.__loaded = {}
+        self.reload()
+
+    def delete(self, obj=None):
+        """forgets obj"""
+        if obj is not None:
+            name = obj.__class__.__name__
+            key = name + "." + obj.id
+            self.__index.get(name, {}).pop(key, None)
+            self.__overlay.get(name, {}).pop(key, None)
+            self.__loaded.pop(key, None)
+            self.__changes = (self.__changes[0] + 1, datetime.utcnow())
+
+    def reload(self):
+        """maps the snapshot again if it changed on disk"""
+        try:
+            st = os.stat(self.__file_path)
+        except OSError:
+            return
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if stamp == self.__stamp or st.st_size == 0:
+            return
+        with open(self.__file_path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        names = binary_format.read_header(buf)[0]
+        index = {}
+        for key, offset, end in binary_format.scan(buf):
+            index.setdefault(key.partition(".")[0], {})[key] = (offset, end)
+        for name, objs in self.__overlay.items():
+            for key in objs:
+                index.get(name, {}).pop(key, None)
+        self.__map, self.__names, self.__index = buf, names, index
+        self.__loaded = {}
+        self.__stamp = stamp
+
+    def close(self):
+        """call reload() method for picking up a newer snapshot"""
+        self.reload()
+
+    def get(self, cls, id):
+        '''method to retrieve one object with spacific id'''
+        name = self.__class_name(cls)
+        if name not in classes:
+            return None
+        return self.load(name + "." + str(id))
+
+    def count(self, cls=None):
+        '''method to count the number of objects in storage'''
+        if cls:
+            name = self.__class_name(cls)
+            if name not in classes:
+                return 0
+            return (len(self.__index.get(name, {})) +
+                    len(self.__overlay.get(name, {})))
+        return sum(len(records) for records in self.__index.values()) + \
+            sum(len(objs) for objs in self.__overlay.values())
+
+    def counts(self):
+        """returns {<class name>: number of objects} for every class"""
+        return {name: (len(self.__index.get(name, {})) +
+                       len(self.__overlay.get(name, {})))
+                for name in classes}
+
+    def version(self, cls):
+        """returns (tag, datetime or None) for the objects of class cls:
+        the tag changes whenever the snapshot is replaced or an object is
+        added or deleted, and no change was made after the datetime"""
+        when = self.__changes[1]
+        if self.__stamp is not None:
+            mapped = datetime.utcfromtimestamp(self.__stamp[2] / 1e9)
+            when = mapped if when is None else max(when, mapped)
+        return "{}-{}".format(self.__stamp, self.__changes[0]), when
+
+    def filter(self, cls, load=None, **criteria):
+        """returns the cls objects matching every criterion, keyed like
+        all(); see models.engine.query for the criteria syntax"""
+        predicates = parse_criteria(criteria)
+        return {key: obj for key, obj in self.all(cls).items()
+                if matches(obj, predicates)}
+
+    def find_one(self, cls, **criteria):
+        """returns one cls object matching every criterion, or None"""
+        predicates = parse_criteria(criteria)
+        for obj in self.all(cls).values():
+            if matches(obj, predicates):
+                return obj
+        return None
+
+    def page(self, cls, limit, cursor=None, **criteria):
+        """returns (up to limit cls objects, cursor of the next page or
+        None), walking the objects matching criteria in (created_at, id)
+        order from the page cursor names"""
+        return page_of(self.filter(cls, **criteria).values(), limit, cursor)
+
+    def search_places(self, states=(), cities=(), amenities=(), ranges=None,
+                      bounds=None, sort=None, limit=None, cursor=None):
+        """returns (places, cursor of the next page or None) for a places
+        search; see models.engine.search"""
+        return search.search_places(self, states, cities, amenities, ranges,
+                                    bounds, sort, limit, cursor)
+
+    def places_near(self, lat, lng, radius, limit=None):
+        """returns [(distance, place)] for the places within radius
+        kilometres of (lat, lng), nearest first; see models.engine.search"""
+        return search.places_near(self, lat, lng, radius, limit)
+
+    def search_text(self, query, limit=None, cursor=None):
+        """returns ([(score, object)], cursor of the next page or None) for
+        a full-text search; see models.engine.search"""
+        return search.search_text(self, query, limit, cursor)
+
+    def related(self, cls, attr, parent_id):
+        """returns the cls objects whose foreign key attr is parent_id"""
+        return [obj for obj in self.all(cls).values()
+                if getattr(obj, attr, None) == parent_id]
+
+    def load(self, key):
+        """returns the object stored under key, or None"""
+        name = key.partition(".")[0]
+        obj = self.__overlay.get(name, {}).get(key)
+        if obj is None:
+            obj = self.__loaded.get(key)
+        if obj is not None:
+            return obj
+        where = self.__index.get(name, {}).get(key)
+        if where is None:
+            return None
+        key, record, end = binary_format.decode(self.__map, where[0],
+                                                self.__names)
+        obj = self.__loaded[key] = classes[name](**record)
+        return obj
+
+    @staticmethod
+    def __class_name(cls):
+        """returns the class name for a class or a class name string"""
+        if cls is None or isinstance(cls, str):
+            return cls
+        return cls.__name__
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Contains the connection pool settings and metrics used by DBStorage
+
+The pool is sized and tuned from the environment:
+
+    HBNB_DB_POOL_SIZE       connections kept open (default 5)
+    HBNB_DB_MAX_OVERFLOW    extra connections opened under load (default 10)
+    HBNB_DB_POOL_TIMEOUT    seconds to wait for a connection (default 30)
+    HBNB_DB_POOL_RECYCLE    seconds after which a connection is replaced
+                            (default 3600, below MySQL's wait_timeout)
+    HBNB_DB_POOL_PRE_PING   1 to test a connection before handing it out
+                            (default 1)
+"""
+
+from os import getenv
+import threading
+from time import monotonic
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that keeps track of how long checkouts wait"""
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate a TimedQueuePool object"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        # integer - connections handed out so far
+        self.checkouts = 0
+        # integer - checkouts that gave up after the pool timeout
+        self.timeouts = 0
+        # float - seconds spent waiting for a connection, in total,
+        # timeouts included
+        self.wait_total = 0.0
+        # float - longest wait for a connection, in seconds
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        """hands out a connection, timing the wait for it"""
+        start = monotonic()
+        outcome = None
+        try:
+            conn = super()._do_get()
+            outcome = "checkouts"
+            return conn
+        except TimeoutError:
+            outcome = "timeouts"
+            raise
+        finally:
+            wait = monotonic() - start
+            with self.__lock:
+                if outcome == "checkouts":
+                    self.checkouts += 1
+                elif outcome == "timeouts":
+                    self.timeouts += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+    def status_dict(self):
+        """returns the pool's current usage and wait statistics"""
+        return {"pool_size": self.size(),
+                "checked_out": self.checkedout(),
+                "idle": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total": self.wait_total,
+                "wait_max": self.wait_max}
+
+
+def pool_options():
+    """returns the create_engine() pool options set by the environment"""
+    return {"poolclass": TimedQueuePool,
+            "pool_size": int(getenv('HBNB_DB_POOL_SIZE', '5')),
+            "max_overflow": int(getenv('HBNB_DB_MAX_OVERFLOW', '10')),
+            "pool_timeout": float(getenv('HBNB_DB_POOL_TIMEOUT', '30')),
+            "pool_recycle": int(getenv('HBNB_DB_POOL_RECYCLE', '3600')),
+            "pool_pre_ping": getenv('HBNB_DB_POOL_PRE_PING',
+                                    '1').lower() in ('1', 'true')}
@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+"""
+Contains the criteria parsing shared by the storage engines' filter()
+
+Criteria are keyword arguments naming an attribute, optionally followed by
+a double underscore and an operator:
+
+    storage.filter(Place, city_id="0af5")              # equality
+    storage.filter(City, state_id__in=["a1", "b2"])    # membership
+    storage.filter(Place, price_by_night__gte=50,
+                   price_by_night__lt=100)             # range
+
+page() walks objects in (created_at, id) order; the cursor it returns is
+an opaque token naming the last object of the page. Searches sorted on a
+numeric attribute use cursors naming the (value, id) of that object.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+import heapq
+import json
+import operator
+
+time = "%Y-%m-%dT%H:%M:%S.%f"
+
+# operator name -> function(attribute value, operand) -> bool
+OPERATORS = {
+    "eq": operator.eq,
+    "in": lambda value, operand: value in operand,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+def parse_criteria(criteria):
+    """returns [(attribute, operator, operand)] for filter() keywords"""
+    predicates = []
+    for keyword, operand in criteria.items():
+        attr, sep, op = keyword.rpartition("__")
+        if not sep or op not in OPERATORS:
+            attr, op = keyword, "eq"
+        if op == "in":
+            operand = list(operand)
+        predicates.append((attr, op, operand))
+    return predicates
+
+
+def matches(obj, predicates):
+    """tells whether obj satisfies every (attribute, operator, operand)"""
+    for attr, op, operand in predicates:
+        value = getattr(obj, attr, None)
+        try:
+            if value is None or not OPERATORS[op](value, operand):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def stamp(value):
+    """returns a datetime, or its to_dict() string, as that string
+
+    The strings have a fixed width, so they sort like the dates.
+    """
+    if isinstance(value, str):
+        return value
+    return value.isoformat(timespec="microseconds")
+
+
+def cursor_of(obj):
+    """returns the cursor of the page that starts after obj"""
+    raw = "{}|{}".format(stamp(obj.created_at), obj.id)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def parse_cursor(cursor):
+    """returns (created_at string, id) of a cursor, or raises ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        created, sep, oid = raw.decode("utf-8").partition("|")
+    except (binascii.Error, UnicodeError):
+        raise ValueError("invalid cursor")
+    if not sep or not oid:
+        raise ValueError("invalid cursor")
+    datetime.strptime(created, time)
+    return created, oid
+
+
+def page_of(objects, limit, cursor=None):
+    """returns (page, next cursor) of the objects in (created_at, id) order
+
+    This sorts every object; the engines use it when they have no index
+    that already keeps the order.
+    """
+    entries = sorted(((stamp(obj.created_at), obj.id), obj)
+                     for obj in objects)
+    if cursor is not None:
+        position = parse_cursor(cursor)
+        entries = [entry for entry in entries if entry[0] > position]
+    page = [obj for position, obj in entries[:limit + 1]]
+    if len(page) > limit:
+        return page[:limit], cursor_of(page[limit - 1])
+    return page, None
+
+
+def sort_value(attr, value):
+    """returns what the sorted indexes file value of attr under: a string
+    for the timestamps, the number itself for numbers, None otherwise"""
+    if value is None:
+        return None
+    if attr in ("created_at", "updated_at"):
+        return stamp(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def sort_cursor_of(obj, attr):
+    """returns the cursor of the page that starts after obj when sorting
+    on attr"""
+    return value_cursor(getattr(obj, attr), obj.id)
+
+
+def value_cursor(value, oid):
+    """returns the cursor of the page that starts after the (value, id)
+    entry of a sorted or ranked order"""
+    raw = json.dumps([value, oid], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def parse_sort_cursor(cursor):
+    """returns (value, id) of a sort cursor, or raises ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        value, oid = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeError, TypeError):
+        raise ValueError("invalid cursor")
+    if sort_value("", value) is None or not isinstance(oid, str):
+        raise ValueError("invalid cursor")
+    return value, oid
+
+
+def top_of(entries, limit=None, position=None, descending=False):
+    """returns the (value, key, ...) entries coming after position in
+    (value, key) order, or before it in reverse order when descending;
+    only the first limit + 1 of them when limit is given, found without
+    sorting the rest"""
+    if position is not None:
+        if descending:
+            entries = (e for e in entries if (e[0], e[1]) < position)
+        else:
+            entries = (e for e in entries if (e[0], e[1]) > position)
+    if limit is None:
+        return sorted(entries, key=lambda e: (e[0], e[1]),
+                      reverse=descending)
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return pick(limit + 1, entries, key=lambda e: (e[0], e[1]))
@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+"""
+Contains the places searches of storage engines without indexes for them
+
+FileStorage answers the same searches from its indexes and DBStorage with
+SQL statements; both follow the semantics documented here.
+"""
+
+import heapq
+from models.city import City
+from models.engine.geo import coordinates, distance, in_box
+from models.engine.indexes import TextIndex
+from models.engine.query import page_of, parse_sort_cursor, sort_cursor_of, \
+    sort_value, top_of, value_cursor
+from models.place import Place
+
+# Place attributes a search can bound and sort on
+RANGE_FIELDS = ("price_by_night", "max_guest", "number_rooms",
+                "number_bathrooms")
+# class name -> attribute holding the text search_text() looks in
+TEXT_FIELDS = {"Place": "description", "Review": "text"}
+
+
+def search_places(storage, states=(), cities=(), amenities=(), ranges=None,
+                  bounds=None, sort=None, limit=None, cursor=None):
+    """returns (places, cursor of the next page or None)
+
+    The places are those in the cities listed or in a city of the states
+    listed (every place when both lists are empty) that have every amenity
+    listed. ranges maps attributes of RANGE_FIELDS to inclusive (low,
+    high) bounds, None leaving an end open, and bounds is a (south, west,
+    north, east) box of models.engine.geo the places must lie in.
+    Without limit they come as an iterable in no particular order and the
+    cursor is None; with it, one page in (created_at, id) order is
+    returned, starting after cursor.
+
+    sort is (attribute of RANGE_FIELDS, descending): the places then come
+    in (attribute, id) order, or the reverse, and the cursor names the
+    (attribute, id) of the last place of the page. Places whose attribute
+    is not a number are left out.
+    """
+    city_ids = set(cities)
+    if states:
+        city_ids.update(city.id for city in storage.filter(
+            City, state_id__in=states).values())
+    load = ['amenities'] if amenities else None
+    if states or cities:
+        places = storage.filter(Place, city_id__in=city_ids,
+                                load=load).values()
+    else:
+        places = storage.iter_all(Place, load=load)
+    wanted = set(amenities)
+    if wanted:
+        places = (place for place in places
+                  if wanted <= {amenity.id for amenity in place.amenities})
+    for attr, (low, high) in (ranges or {}).items():
+        places = (place for place in places
+                  if in_range(getattr(place, attr, None), low, high))
+    if bounds is not None:
+        places = (place for place in places
+                  if location(place) is not None and
+                  in_box(*location(place), box=bounds))
+    if sort is not None:
+        attr, descending = sort
+        position = None if cursor is None else parse_sort_cursor(cursor)
+        entries = ((sort_value(attr, getattr(place, attr, None)), place.id,
+                    place) for place in places)
+        entries = top_of((e for e in entries if e[0] is not None), limit,
+                         position, descending)
+        places = [e[2] for e in entries]
+        if limit is not None and len(places) > limit:
+            return places[:limit], sort_cursor_of(places[limit - 1], attr)
+        return places, None
+    if limit is None:
+        return places, None
+    return page_of(places, limit, cursor)
+
+
+def in_range(value, low=None, high=None):
+    """returns True if value is a number within the inclusive bounds"""
+    value = sort_value("", value)
+    return value is not None and (low is None or value >= low) and \
+        (high is None or value <= high)
+
+
+def places_near(storage, lat, lng, radius, limit=None):
+    """returns [(distance, place)] for the places within radius kilometres
+    of (lat, lng), nearest first, at most limit of them; places without a
+    location are left out"""
+    found = []
+    for place in storage.iter_all(Place):
+        point = location(place)
+        if point is not None:
+            away = distance(lat, lng, point[0], point[1])
+            if away <= radius:
+                found.append((away, place.id, place))
+    found = sorted(found) if limit is None else heapq.nsmallest(limit, found)
+    return [(away, place) for away, oid, place in found]
+
+
+def location(place):
+    """returns the (latitude, longitude) of place, or None"""
+    return coordinates(getattr(place, "latitude", None),
+                       getattr(place, "longitude", None))
+
+
+def search_text(storage, query, limit=None, cursor=None):
+    """returns ([(score, object)], cursor of the next page or None) for
+    the objects whose TEXT_FIELDS attribute contains a term of query
+
+    The best BM25 match comes first; with limit, one page is returned,
+    starting after the (score, key) entry cursor names. Without an index
+    kept by the storage, every text is read to build one for the query.
+    """
+    return text_page(TextIndex(texts(storage)), query,
+                     lambda key: storage.get(*key.split(".", 1)),
+                     limit, cursor)
+
+
+def texts(storage):
+    """yields (key, text) for the objects of storage whose TEXT_FIELDS
+    attribute holds text"""
+    for name, attr in TEXT_FIELDS.items():
+        for obj in storage.iter_all(name):
+            text = getattr(obj, attr, None)
+            if isinstance(text, str):
+                yield name + "." + obj.id, text
+
+
+def text_page(index, query, lookup, limit=None, cursor=None):
+    """returns ([(score, object)], cursor of the next page or None) for
+    query in the TextIndex index, best first; lookup(key) returns the
+    object filed under key, or None"""
+    position = None if cursor is None else parse_sort_cursor(cursor)
+    entries = top_of(((score, key) for key, score in
+                      index.scores(query).items()),
+                     limit, position, descending=True)
+    found = []
+    for score, key in entries:
+        obj = lookup(key)
+        if obj is not None:
+            found.append((score, key, obj))
+            if limit is not None and len(found) > limit:
+                score, key, obj = found[limit - 1]
+                return ([(score, obj) for score, key, obj in found[:limit]],
+                        value_cursor(score, key))
+    return [(score, obj) for score, key, obj in found], None
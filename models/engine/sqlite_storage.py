@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.engine.db_storage import DBStorage
+from os import getenv
+import sqlite3
+
+
+class SQLiteStorage(DBStorage):
+    """interacts with a local SQLite database file
+
+    The file is named by HBNB_SQLITE_PATH (default hbnb.db). Every
+    connection runs in WAL mode, so readers do not block the writer, and
+    enforces foreign keys like MySQL does.
+    """
+
+    def __init__(self):
+        """Instantiate a SQLiteStorage object"""
+        path = getenv('HBNB_SQLITE_PATH', 'hbnb.db')
+
+        def connect():
+            """opens a connection with the pragmas this storage relies on"""
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            return conn
+
+        super().__init__('sqlite://', creator=connect)
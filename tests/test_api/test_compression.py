@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+Contains the TestCompressionDocs and TestCompression classes
+"""
+
+from api.v1 import compression
+from api.v1.app import app
+import gzip
+import inspect
+import json
+import pep8
+import unittest
+
+
+class TestCompressionDocs(unittest.TestCase):
+    """Tests to check the documentation and style of compression"""
+
+    def test_pep8_conformance_compression(self):
+        """Test that api/v1/compression.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/compression.py',
+                                    'tests/test_api/test_compression.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_compression_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(compression.__doc__) >= 1)
+        for func in inspect.getmembers(compression, inspect.isfunction):
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(compression.level <= 0, "compression is turned off")
+class TestCompression(unittest.TestCase):
+    """Test the encodings of the API responses"""
+
+    def setUp(self):
+        """Creates enough states for a page of them to be compressed"""
+        self.client = app.test_client()
+        self.ids = []
+        for i in range(compression.min_size // 100 + 1):
+            r = self.client.post("/api/v1/states",
+                                 json={"name": "State {}".format(i)})
+            self.ids.append(r.get_json()["id"])
+        self.page = "/api/v1/states?limit={}".format(len(self.ids) * 10)
+
+    def tearDown(self):
+        """Deletes the states"""
+        for state_id in self.ids:
+            self.client.delete("/api/v1/states/" + state_id)
+
+    def get(self, url, encoding="gzip", **headers):
+        """Returns the response to a GET of url accepting encoding, and its
+        body"""
+        headers["Accept-Encoding"] = encoding
+        r = self.client.get(url, headers=headers)
+        return r, r.get_data()
+
+    def test_gzip_over_min_size(self):
+        """Test that a response over min_size is gzipped"""
+        plain, body = self.get(self.page, "identity")
+        self.assertGreater(len(body), compression.min_size)
+        r, data = self.get(self.page)
+        self.assertEqual(r.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(data), body)
+        self.assertIn("Accept-Encoding", r.headers["Vary"])
+
+    def test_identity_under_min_size(self):
+        """Test that a small response is sent as it is"""
+        r, data = self.get("/api/v1/status")
+        self.assertLessEqual(len(data), compression.min_size)
+        self.assertNotIn("Content-Encoding", r.headers)
+        self.assertEqual(json.loads(data), {"status": "OK"})
+        self.assertIn("Accept-Encoding", r.headers["Vary"])
+
+    def test_refused_gzip(self):
+        """Test that gzip;q=0 gets the identity encoding"""
+        r, data = self.get(self.page, "gzip;q=0")
+        self.assertNotIn("Content-Encoding", r.headers)
+        self.assertIsInstance(json.loads(data), list)
+
+    def test_not_modified(self):
+        """Test that a 304 is never encoded"""
+        r, data = self.get(self.page)
+        etag = r.headers["ETag"]
+        r, data = self.get(self.page, **{"If-None-Match": etag})
+        self.assertEqual(r.status_code, 304)
+        self.assertNotIn("Content-Encoding", r.headers)
+        self.assertEqual(data, b"")
+
+    def test_streamed(self):
+        """Test that a streamed list gunzips to the JSON of the list"""
+        plain, body = self.get("/api/v1/states", "identity")
+        r, data = self.get("/api/v1/states")
+        self.assertEqual(r.headers["Content-Encoding"], "gzip")
+        self.assertNotIn("Content-Length", r.headers)
+        self.assertEqual(json.loads(gzip.decompress(data)),
+                         json.loads(body))
+
+    def test_weak_etag(self):
+        """Test that a compressed response's ETag is weak"""
+        plain, body = self.get(self.page, "identity")
+        r, data = self.get(self.page)
+        self.assertFalse(plain.get_etag()[1])
+        self.assertEqual(r.get_etag(), (plain.get_etag()[0], True))
+        again, data = self.get(self.page,
+                               **{"If-None-Match": r.headers["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditionalDocs and TestConditional classes
+"""
+
+from api.v1.app import app
+from api.v1.views import conditional
+from datetime import datetime, timedelta
+import inspect
+import models
+from models.state import State
+import pep8
+import time
+import unittest
+from werkzeug.http import http_date
+
+
+class TestConditionalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of conditional"""
+
+    def test_pep8_conformance_conditional(self):
+        """Test that api/v1/views/conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/conditional.py',
+                                    'tests/test_api/test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_conditional_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(conditional.__doc__) >= 1)
+        for func in inspect.getmembers(conditional, inspect.isfunction):
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestConditional(unittest.TestCase):
+    """Test the conditional GETs of the API views"""
+
+    def setUp(self):
+        """Creates two states through the API"""
+        self.client = app.test_client()
+        self.ids = []
+        for name in ("Iowa", "Ohio"):
+            r = self.client.post("/api/v1/states", json={"name": name})
+            self.ids.append(r.get_json()["id"])
+
+    def tearDown(self):
+        """Deletes the states left"""
+        for state_id in self.ids:
+            self.client.delete("/api/v1/states/" + state_id)
+
+    def get(self, url, **headers):
+        """Returns the response to a GET of url, its body read"""
+        r = self.client.get(url, headers=headers)
+        r.get_data()
+        return r
+
+    def test_matching_etag(self):
+        """Test that a request holding the ETag gets an empty 304"""
+        for url in ("/api/v1/states", "/api/v1/states/" + self.ids[0]):
+            first = self.get(url)
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers["ETag"]
+            again = self.get(url, **{"If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.get_data(), b"")
+            self.assertEqual(again.headers["ETag"], etag)
+            other = self.get(url, **{"If-None-Match": '"other"'})
+            self.assertEqual(other.status_code, 200)
+
+    def test_changed_after_put(self):
+        """Test that a PUT changes the ETag of the object and its list"""
+        url = "/api/v1/states/" + self.ids[0]
+        etags = [self.get(u).headers["ETag"] for u in (url, "/api/v1/states")]
+        self.client.put(url, json={"name": "Iowa City"})
+        for u, etag in zip((url, "/api/v1/states"), etags):
+            r = self.get(u, **{"If-None-Match": etag})
+            self.assertEqual(r.status_code, 200)
+
+    def test_changed_after_delete(self):
+        """Test that a DELETE changes the ETag of the list"""
+        etag = self.get("/api/v1/states").headers["ETag"]
+        self.client.delete("/api/v1/states/" + self.ids.pop())
+        r = self.get("/api/v1/states", **{"If-None-Match": etag})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.headers["ETag"],
+                         self.get("/api/v1/states").headers["ETag"])
+
+    def test_if_modified_since_object(self):
+        """Test that If-Modified-Since gets a 304 until the object is
+        changed"""
+        state = models.storage.get(State, self.ids[0])
+        state.updated_at = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        models.storage.new(state)
+        models.storage.save()
+        url = "/api/v1/states/" + self.ids[0]
+        since = self.get(url).headers["Last-Modified"]
+        self.assertEqual(since, "Thu, 28 Sep 2017 21:03:54 GMT")
+        r = self.get(url, **{"If-Modified-Since": since})
+        self.assertEqual(r.status_code, 304)
+        self.client.put(url, json={"name": "Iowa City"})
+        r = self.get(url, **{"If-Modified-Since": since})
+        self.assertEqual(r.status_code, 200)
+        self.assertNotIn("Last-Modified", r.headers)
+
+    def test_if_modified_since_list(self):
+        """Test that If-Modified-Since never gets a 304 once the list had
+        an object deleted"""
+        time.sleep(1 - datetime.utcnow().microsecond / 1e6)
+        first = self.get("/api/v1/states")
+        since = first.headers.get("Last-Modified")
+        if since is not None:
+            r = self.get("/api/v1/states", **{"If-Modified-Since": since})
+            self.assertEqual(r.status_code, 304)
+        else:
+            self.assertEqual(models.storage_t, "db")
+            since = http_date(datetime.utcnow() + timedelta(hours=1))
+        self.client.delete("/api/v1/states/" + self.ids.pop())
+        r = self.get("/api/v1/states", **{"If-Modified-Since": since})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.get_json()), models.storage.count(State))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""
+Contains the TestSearchDocs and TestSearch classes
+"""
+
+from api.v1.app import app
+from api.v1.views import fulltext, places
+import inspect
+import pep8
+import unittest
+
+
+class TestSearchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the search views"""
+
+    def test_pep8_conformance_search(self):
+        """Test that the search views conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/places.py',
+                                    'api/v1/views/fulltext.py',
+                                    'tests/test_api/test_search.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_search_docstrings(self):
+        """Test for the module and function docstrings"""
+        for module in (places, fulltext):
+            self.assertTrue(len(module.__doc__) >= 1)
+            for func in inspect.getmembers(module, inspect.isfunction):
+                if func[1].__module__ != module.__name__:
+                    continue
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestSearch(unittest.TestCase):
+    """Test the places_search, places_near and search views"""
+
+    def setUp(self):
+        """Creates a state, a city, a user and three places through the
+        API"""
+        self.client = app.test_client()
+        self.state = self.post("/api/v1/states", name="Iowa")
+        self.city = self.post("/api/v1/states/{}/cities".format(
+            self.state), name="Ames")
+        self.user = self.post("/api/v1/users", email="search@hbnb.io",
+                              password="pwd")
+        self.places = [
+            self.post("/api/v1/cities/{}/places".format(self.city),
+                      user_id=self.user, name=name, price_by_night=price,
+                      latitude=42.03 + i / 100, longitude=-93.62,
+                      description=description)
+            for i, (name, price, description) in enumerate([
+                ("Loft", 10, "A loft by the quarry"),
+                ("Hut", 99, "A hut in the woods"),
+                ("Barn", 50, "A barn near the quarry lake")])]
+
+    def tearDown(self):
+        """Deletes what setUp created"""
+        for place_id in self.places:
+            self.client.delete("/api/v1/places/" + place_id)
+        self.client.delete("/api/v1/users/" + self.user)
+        self.client.delete("/api/v1/cities/" + self.city)
+        self.client.delete("/api/v1/states/" + self.state)
+
+    def post(self, url, **body):
+        """Returns the id of the object a POST of body to url creates"""
+        r = self.client.post(url, json=body)
+        self.assertEqual(r.status_code, 201, r.get_data())
+        return r.get_json()["id"]
+
+    def search(self, body, query=""):
+        """Returns the response to a places_search of body"""
+        r = self.client.post("/api/v1/places_search" + query, json=body)
+        r.get_data()
+        return r
+
+    def test_places_search_pages(self):
+        """Test that a sorted search pages through its results"""
+        body = {"cities": [self.city], "sort": "-price_by_night"}
+        ids = []
+        r = self.search(body, "?limit=2")
+        while True:
+            self.assertEqual(r.status_code, 200)
+            ids.extend(place["id"] for place in r.get_json())
+            cursor = r.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            r = self.search(body, "?limit=2&cursor=" + cursor)
+        self.assertEqual(ids, [self.places[1], self.places[2],
+                               self.places[0]])
+        r = self.search({"cities": [self.city],
+                         "price_by_night": {"min": 20, "max": 60}})
+        self.assertEqual([p["id"] for p in r.get_json()], [self.places[2]])
+
+    def test_places_search_errors(self):
+        """Test that malformed searches get a 400"""
+        for body in ({"sort": "name"}, {"sort": 3},
+                     {"price_by_night": {"least": 3}},
+                     {"price_by_night": {"min": "3"}},
+                     {"bounds": [1, 2, 3, 4]},
+                     {"bounds": {"south": 50, "west": 0,
+                                 "north": 40, "east": 1}},
+                     {"bounds": {"south": 0, "west": 0, "north": 95,
+                                 "east": 1}}):
+            with self.subTest(body=body):
+                self.assertEqual(self.search(body).status_code, 400)
+        self.assertEqual(self.search({}, "?limit=0").status_code, 400)
+        self.assertEqual(self.search({}, "?cursor=nope").status_code, 400)
+        r = self.client.post("/api/v1/places_search", data="nope",
+                             content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+
+    def test_places_near(self):
+        """Test that places come nearest first with their distance"""
+        r = self.client.get("/api/v1/places_near?lat=42.03&lng=-93.62"
+                            "&radius=5&limit=2")
+        self.assertEqual(r.status_code, 200)
+        found = r.get_json()
+        self.assertEqual([p["id"] for p in found], self.places[:2])
+        self.assertLess(found[0]["distance"], found[1]["distance"])
+
+    def test_places_near_errors(self):
+        """Test that a bad location, radius, limit or any cursor gets a
+        400"""
+        for query in ("", "lat=42", "lat=x&lng=1", "lat=91&lng=0",
+                      "lat=0&lng=181", "lat=0&lng=0&radius=-1",
+                      "lat=0&lng=0&radius=x", "lat=0&lng=0&limit=0",
+                      "lat=0&lng=0&cursor=abc"):
+            with self.subTest(query=query):
+                r = self.client.get("/api/v1/places_near?" + query)
+                self.assertEqual(r.status_code, 400)
+
+    def test_search_text(self):
+        """Test that the full-text search ranks and pages its matches"""
+        r = self.client.get("/api/v1/search?q=quarry&limit=1")
+        self.assertEqual(r.status_code, 200)
+        first = r.get_json()
+        cursor = r.headers["X-Next-Cursor"]
+        r = self.client.get("/api/v1/search?q=quarry&limit=1&cursor=" +
+                            cursor)
+        second = r.get_json()
+        self.assertEqual({first[0]["id"], second[0]["id"]},
+                         {self.places[0], self.places[2]})
+        self.assertGreaterEqual(first[0]["score"], second[0]["score"])
+
+    def test_search_text_errors(self):
+        """Test that a missing query or a bad cursor gets a 400"""
+        for query in ("", "q=", "q=%20", "q=quarry&cursor=nope",
+                      "q=quarry&limit=x"):
+            with self.subTest(query=query):
+                r = self.client.get("/api/v1/search?" + query)
+                self.assertEqual(r.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -96,6 +96,15 @@ class TestBaseModel(unittest.TestCase):
         self.assertNotEqual(inst1.created_at, inst2.created_at)
         self.assertNotEqual(inst1.updated_at, inst2.updated_at)
 
+    def test_datetime_kwargs(self):
+        """Test that datetime values passed as kwargs are kept as is"""
+        created = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        updated = datetime(2017, 9, 28, 21, 5, 54, 119572)
+        inst = BaseModel(id="56d43177", created_at=created,
+                         updated_at=updated)
+        self.assertEqual(inst.created_at, created)
+        self.assertEqual(inst.updated_at, updated)
+
     def test_uuid(self):
         """Test that id is a valid uuid"""
         inst1 = BaseModel()
@@ -138,6 +147,20 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_to_dict_unformatted_dates(self):
+        """test that to_dict(format_dates=False) keeps datetimes whose
+        isoformat() matches the strftime layout"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        bm = BaseModel()
+        bm.created_at = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        bm.updated_at = datetime(2017, 9, 28, 21, 3, 54)
+        new_d = bm.to_dict(format_dates=False)
+        self.assertEqual(new_d["created_at"], bm.created_at)
+        self.assertEqual(new_d["created_at"].isoformat(),
+                         bm.created_at.strftime(t_format))
+        self.assertEqual(new_d["updated_at"],
+                         bm.updated_at.strftime(t_format))
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
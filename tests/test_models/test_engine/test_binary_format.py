@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+"""
+Contains the TestBinaryFormatDocs and TestBinaryFormat classes
+"""
+
+from datetime import datetime
+import inspect
+import io
+import json
+import models
+from models.engine import binary_format, file_storage
+from models.city import City
+from models.state import State
+import os
+import pep8
+import tempfile
+import unittest
+FileStorage = file_storage.FileStorage
+
+
+class TestBinaryFormatDocs(unittest.TestCase):
+    """Tests to check the documentation and style of binary_format"""
+
+    def test_pep8_conformance_binary_format(self):
+        """Test that models/engine/binary_format.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/binary_format.py',
+                                    'tests/test_models/test_engine/\
+test_binary_format.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_binary_format_module_docstring(self):
+        """Test for the binary_format.py module docstring"""
+        self.assertIsNot(binary_format.__doc__, None,
+                         "binary_format.py needs a docstring")
+        self.assertTrue(len(binary_format.__doc__) >= 1,
+                        "binary_format.py needs a docstring")
+
+    def test_binary_format_func_docstrings(self):
+        """Test for the presence of docstrings in binary_format functions"""
+        for func in inspect.getmembers(binary_format, inspect.isfunction):
+            if func[1].__module__ != binary_format.__name__:
+                continue
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test the binary snapshot format"""
+    record = {"id": "0af5-place", "__class__": "Place",
+              "created_at": "2017-09-28T21:03:54.052298",
+              "updated_at": "2017-09-28T21:05:54.119572",
+              "name": "Lovely place", "number_rooms": 3,
+              "latitude": 37.77, "description": None,
+              "amenity_ids": ["a", "b"]}
+
+    def test_round_trip(self):
+        """Test that records come back with datetime timestamps"""
+        f = io.BytesIO()
+        binary_format.dump([("Place.0af5-place", self.record)], f,
+                           ["City", "Place"])
+        f.seek(0)
+        (key, record), = list(binary_format.load(f))
+        self.assertEqual(key, "Place.0af5-place")
+        self.assertEqual(record["created_at"],
+                         datetime(2017, 9, 28, 21, 3, 54, 52298))
+        self.assertEqual(record["updated_at"],
+                         datetime(2017, 9, 28, 21, 5, 54, 119572))
+        for attr in ("id", "__class__", "name", "number_rooms", "latitude",
+                     "description", "amenity_ids"):
+            self.assertEqual(record[attr], self.record[attr])
+
+    def test_packed_records(self):
+        """Test that records() leaves records packed, that unpack() decodes
+        them as load() does and that dump() copies them under new tags"""
+        f = io.BytesIO()
+        binary_format.dump([("Place.0af5-place", self.record)], f,
+                           ["City", "Place"])
+        f.seek(0)
+        (key, data), = list(binary_format.records(f))
+        self.assertEqual(key, "Place.0af5-place")
+        self.assertIsInstance(data, bytes)
+        f.seek(0)
+        (key, record), = list(binary_format.load(f))
+        self.assertEqual(binary_format.unpack(data, "Place"), record)
+        again = io.BytesIO()
+        binary_format.dump([(key, data)], again, ["Place"])
+        again.seek(0)
+        self.assertEqual(list(binary_format.load(again)), [(key, record)])
+
+    def test_rejects_other_files(self):
+        """Test that a file without the magic number is refused"""
+        with self.assertRaises(ValueError):
+            list(binary_format.load(io.BytesIO(b'{"a": 1}')))
+
+    def test_json_conversion(self):
+        """Test that converting to binary and back preserves file.json"""
+        jo = {"Place.0af5-place": self.record}
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "file.json")
+            with open(src, "w") as f:
+                json.dump(jo, f)
+            binary_format.json_to_binary(src, os.path.join(tmp, "file.bin"))
+            binary_format.binary_to_json(os.path.join(tmp, "file.bin"),
+                                         os.path.join(tmp, "back.json"))
+            with open(os.path.join(tmp, "back.json")) as f:
+                self.assertEqual(json.load(f), jo)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_file_storage_binary_snapshot(self):
+        """Test that FileStorage saves to and reloads from file.bin"""
+        saved = {attr: getattr(FileStorage, attr) for attr in
+                 ("_FileStorage__binary", "_FileStorage__file_path",
+                  "_FileStorage__journal", "_FileStorage__flush_ms",
+                  "_FileStorage__flush_count")}
+        FileStorage._FileStorage__binary = True
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__flush_ms = 0
+        FileStorage._FileStorage__flush_count = 0
+        FileStorage._FileStorage__file_path = "file.bin"
+        try:
+            storage = FileStorage()
+            state = State(name="Binary")
+            state.save()
+            storage.delete(state)
+            FileStorage._FileStorage__stamp = None
+            storage.reload()
+            reloaded = storage.get(State, state.id)
+            self.assertIsNot(reloaded, state)
+            self.assertEqual(reloaded.name, "Binary")
+            self.assertEqual(reloaded.created_at, state.created_at)
+            self.assertEqual(reloaded.updated_at, state.updated_at)
+        finally:
+            for attr, value in saved.items():
+                setattr(FileStorage, attr, value)
+            FileStorage._FileStorage__stamp = None
+            if os.path.exists("file.bin"):
+                os.remove("file.bin")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_file_storage_packed_records(self):
+        """Test that FileStorage keeps binary records packed until they are
+        built or their class is indexed, and writes them back intact"""
+        saved = {attr: getattr(FileStorage, attr) for attr in
+                 ("_FileStorage__binary", "_FileStorage__file_path",
+                  "_FileStorage__journal", "_FileStorage__flush_ms",
+                  "_FileStorage__flush_count")}
+        FileStorage._FileStorage__binary = True
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__flush_ms = 0
+        FileStorage._FileStorage__flush_count = 0
+        FileStorage._FileStorage__file_path = "file.bin"
+        try:
+            storage = FileStorage()
+            state = State(name="Packed")
+            city = City(name="Packed", state_id=state.id)
+            for obj in (state, city):
+                storage.new(obj)
+            storage.save()
+            for obj in (state, city):
+                storage.delete(obj)
+            FileStorage._FileStorage__stamp = None
+            storage.reload()
+            raw = FileStorage._FileStorage__raw
+            self.assertIsInstance(raw["City"]["City." + city.id], bytes)
+            self.assertGreaterEqual(storage.count(City), 1)
+            cities = storage.related(City, "state_id", state.id)
+            self.assertEqual([c.id for c in cities], [city.id])
+            self.assertEqual(cities[0].name, "Packed")
+            self.assertIsInstance(raw["State"]["State." + state.id], bytes)
+            storage.save()
+            FileStorage._FileStorage__stamp = None
+            storage.reload()
+            reloaded = storage.get(State, state.id)
+            self.assertEqual(reloaded.name, "Packed")
+            self.assertEqual(reloaded.created_at, state.created_at)
+            for obj in storage.related(City, "state_id", state.id) + \
+                    [reloaded]:
+                storage.delete(obj)
+            storage.save()
+        finally:
+            for attr, value in saved.items():
+                setattr(FileStorage, attr, value)
+            FileStorage._FileStorage__stamp = None
+            if os.path.exists("file.bin"):
+                os.remove("file.bin")
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Contains the TestCacheDocs and TestLRUCache classes
+"""
+
+import inspect
+from models.engine import cache
+import pep8
+import time
+import unittest
+LRUCache = cache.LRUCache
+
+
+class TestCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of cache"""
+
+    def test_pep8_conformance_cache(self):
+        """Test that models/engine/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/cache.py',
+                                    'tests/test_models/test_engine/\
+test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(cache.__doc__) >= 1)
+        self.assertTrue(len(LRUCache.__doc__) >= 1)
+        for func in inspect.getmembers(LRUCache, inspect.isfunction):
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test the LRUCache class"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that a full cache drops the entry read least recently"""
+        lru = LRUCache(2, 60)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        self.assertEqual(lru.get("a"), 1)
+        lru.put("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
+        lru.discard("a")
+        self.assertIsNone(lru.get("a"))
+        lru.clear()
+        self.assertEqual(len(lru), 0)
+
+    def test_expires(self):
+        """Test that an entry is gone once its ttl has passed"""
+        lru = LRUCache(2, 0.01)
+        lru.put("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(len(lru), 0)
@@ -97,4 +97,81 @@ class TestFileStorage(unittest.TestCase):
         """Test that all returns a dictionaty"""
         amenity = Amenity(name='bed room')
         amenity.save()
-        self.assertIs(type(models.storage.get(Amenity, amenity.id)), dict)
+        self.assertIs(models.storage.get(Amenity, amenity.id), amenity)
+        self.assertIs(models.storage.get("Amenity", amenity.id), amenity)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_filter(self):
+        """Test that filter() pushes equality, membership and range
+        criteria into the query"""
+        state = State(name="Filtered")
+        city = City(name="Z", state_id=state.id)
+        user = User(email="f@hbnb.io", password="pwd")
+        cheap = Place(city_id=city.id, user_id=user.id, name="c",
+                      price_by_night=40)
+        dear = Place(city_id=city.id, user_id=user.id, name="d",
+                     price_by_night=400)
+        for obj in (state, city, user, cheap, dear):
+            models.storage.new(obj)
+        models.storage.save()
+        self.assertEqual(set(models.storage.filter(
+            Place, city_id=city.id).values()), {cheap, dear})
+        self.assertEqual(set(models.storage.filter(
+            Place, city_id__in=[city.id], price_by_night__lt=100).values()),
+            {cheap})
+        self.assertIs(models.storage.find_one(City, state_id=state.id), city)
+        self.assertEqual(models.storage.filter(City, no_such_column=1), {})
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_counts(self):
+        """Test that counts() sees new rows and agrees with count()"""
+        before = models.storage.counts()
+        self.assertIs(models.storage.counts(), before)
+        models.storage.new(Amenity(name="counted"))
+        models.storage.save()
+        counts = models.storage.counts()
+        self.assertEqual(counts["Amenity"], before["Amenity"] + 1)
+        self.assertEqual(models.storage.count(Amenity), counts["Amenity"])
+        self.assertEqual(models.storage.count(), sum(counts.values()))
+
+    def test_iter_all_signature(self):
+        """Test that iter_all() takes its arguments in the order the other
+        storage engines do"""
+        from models.engine.file_storage import FileStorage
+        from models.engine.mmap_storage import MmapStorage
+        for engine in (FileStorage, MmapStorage):
+            theirs = list(inspect.signature(engine.iter_all).parameters)
+            ours = list(inspect.signature(DBStorage.iter_all).parameters)
+            self.assertEqual(ours[:len(theirs)], theirs)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_iter_all(self):
+        """Test that iter_all() yields every row of a class"""
+        made = [Amenity(name="iterated") for i in range(3)]
+        for obj in made:
+            models.storage.new(obj)
+        models.storage.save()
+        found = [obj for obj in
+                 models.storage.iter_all(Amenity, chunk_size=2)
+                 if obj.name == "iterated"]
+        self.assertEqual(set(found), set(made))
+        self.assertEqual(len(list(models.storage.iter_all())),
+                         models.storage.count())
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_page(self):
+        """Test that page() walks the rows in created_at order"""
+        made = [Amenity(name="paged", created_at=datetime(2001, 1, 1, 0, i))
+                for i in range(5)]
+        for obj in made:
+            models.storage.new(obj)
+        models.storage.save()
+        seen, cursor = [], None
+        while True:
+            page, cursor = models.storage.page(Amenity, 2, cursor,
+                                               name="paged")
+            self.assertLessEqual(len(page), 2)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, made)
@@ -5,6 +5,7 @@ Contains the TestFileStorageDocs classes
 
 from datetime import datetime
 import inspect
+import io
 import models
 from models.engine import file_storage
 from models.amenity import Amenity
@@ -17,10 +18,38 @@ from models.user import User
 import json
 import os
 import pep8
+import subprocess
+import sys
+import threading
+import time
 import unittest
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# the settings the tests expect, whatever HBNB_FILE_* set at import
+plain_mode = {"_FileStorage__binary": False,
+              "_FileStorage__file_path": "file.json",
+              "_FileStorage__journal_path": "file.json.journal",
+              "_FileStorage__journal": False,
+              "_FileStorage__flush_ms": 0,
+              "_FileStorage__flush_count": 0}
+
+
+class PlainModeTestCase(unittest.TestCase):
+    """Runs each test with FileStorage in plain_mode"""
+
+    def setUp(self):
+        """Switch FileStorage to plain_mode"""
+        self.mode = {attr: getattr(FileStorage, attr) for attr in plain_mode}
+        for attr, value in plain_mode.items():
+            setattr(FileStorage, attr, value)
+        FileStorage._FileStorage__stamp = None
+
+    def tearDown(self):
+        """Restore the settings read at import"""
+        for attr, value in self.mode.items():
+            setattr(FileStorage, attr, value)
+        FileStorage._FileStorage__stamp = None
 
 
 class TestFileStorageDocs(unittest.TestCase):
@@ -68,15 +97,122 @@ test_file_storage.py'])
                             "{:s} method needs a docstring".format(func[0]))
 
 
-class TestFileStorage(unittest.TestCase):
+class TestFileStorage(PlainModeTestCase):
     """Test the FileStorage class"""
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_all_returns_dict(self):
-        """Test that all returns the FileStorage.__objects attr"""
+        """Test that all returns a snapshot of the FileStorage.__objects
+        attr"""
         storage = FileStorage()
         new_dict = storage.all()
         self.assertEqual(type(new_dict), dict)
-        self.assertIs(new_dict, storage._FileStorage__objects)
+        self.assertEqual(new_dict, storage._FileStorage__objects)
+        self.assertIsNot(new_dict, storage._FileStorage__objects)
+        self.assertIs(storage.all(), new_dict)
+        state = State()
+        storage.new(state)
+        self.assertNotIn("State." + state.id, new_dict)
+        self.assertIn("State." + state.id, storage.all())
+        storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_concurrent_readers_and_writers(self):
+        """Test that readers iterating storage never see it change size
+        while other threads write"""
+        storage = FileStorage()
+        bulk = [State() for i in range(2000)]
+        for obj in bulk:
+            storage.new(obj)
+        errors = []
+        done = threading.Event()
+
+        def write():
+            """adds and removes objects until told to stop"""
+            try:
+                while not done.is_set():
+                    objs = [City(name="c") for i in range(20)]
+                    for obj in objs:
+                        storage.new(obj)
+                    for obj in objs:
+                        storage.delete(obj)
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        writers = [threading.Thread(target=write) for i in range(3)]
+        for thread in writers:
+            thread.start()
+        try:
+            for i in range(200):
+                for obj in storage.all().values():
+                    pass
+                for obj in storage.all(City).values():
+                    pass
+                storage.count()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+            for thread in writers:
+                thread.join()
+            sys.setswitchinterval(interval)
+            for obj in bulk:
+                storage.delete(obj)
+        self.assertEqual(errors, [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_readers_race_building(self):
+        """Test that get() and count() see every object while other
+        threads build and reload the records of its class"""
+        storage = FileStorage()
+        lock = FileStorage._FileStorage__lock
+        records = {}
+        for i in range(500):
+            record = State(name="Raced").to_dict()
+            records["State." + record["id"]] = record
+        with lock:
+            for key, record in records.items():
+                storage._FileStorage__put_record(key, dict(record))
+        expected = storage.count(State)
+        ids = [record["id"] for record in records.values()][::25]
+        errors = []
+        done = threading.Event()
+
+        def build():
+            """reloads the records and builds them until told to stop"""
+            try:
+                while not done.is_set():
+                    with lock:
+                        for key, record in records.items():
+                            storage._FileStorage__put_record(key,
+                                                             dict(record))
+                    storage.all(State)
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        builders = [threading.Thread(target=build) for i in range(2)]
+        for thread in builders:
+            thread.start()
+        misses, counts = [], set()
+        try:
+            for i in range(300):
+                misses.extend(oid for oid in ids
+                              if storage.get(State, oid) is None)
+                counts.add(storage.count(State))
+                counts.add(storage.counts()["State"])
+        finally:
+            done.set()
+            for thread in builders:
+                thread.join()
+            sys.setswitchinterval(interval)
+            for record in records.values():
+                storage.delete(storage.get(State, record["id"]))
+        self.assertEqual(errors, [])
+        self.assertEqual(misses, [])
+        self.assertEqual(counts, {expected})
 
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_new(self):
@@ -104,9 +240,12 @@ class TestFileStorage(unittest.TestCase):
             instance_key = instance.__class__.__name__ + "." + instance.id
             new_dict[instance_key] = instance
         save = FileStorage._FileStorage__objects
+        save_raw = FileStorage._FileStorage__raw
         FileStorage._FileStorage__objects = new_dict
+        FileStorage._FileStorage__raw = {}
         storage.save()
         FileStorage._FileStorage__objects = save
+        FileStorage._FileStorage__raw = save_raw
         for key, value in new_dict.items():
             new_dict[key] = value.to_dict()
         string = json.dumps(new_dict)
@@ -125,6 +264,594 @@ class TestFileStorage(unittest.TestCase):
         amenity = Amenity(name='bed room')
         amenity.save()
         storage = FileStorage()
-        new_dict = storage.get(Amenity, amenity.id)
-        self.assertEqual(type(new_dict), dict)
-        self.assertIs(new_dict, storage._FileStorage__objects)
+        self.assertIs(storage.get(Amenity, amenity.id), amenity)
+        self.assertIs(storage.get("Amenity", amenity.id), amenity)
+        self.assertIsNone(storage.get(State, amenity.id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_class_index_follows_new_and_delete(self):
+        """Test that get, all(cls) and count(cls) track new and delete"""
+        storage = FileStorage()
+        state = State(name="Indexed")
+        before = storage.count(State)
+        storage.new(state)
+        key = "State." + state.id
+        self.assertEqual(storage.count(State), before + 1)
+        self.assertIs(storage.all(State)[key], state)
+        self.assertIs(storage.all("State")[key], state)
+        self.assertNotIn(key, storage.all(City))
+        storage.delete(state)
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertNotIn(key, storage.all(State))
+        self.assertEqual(storage.count("State"), before)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_skips_unchanged_file(self):
+        """Test that close() only re-reads file.json when it changed"""
+        storage = FileStorage()
+        state = State(name="Unchanged")
+        state.save()
+        storage.close()
+        self.assertIs(storage.get(State, state.id), state)
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State." + state.id]["name"] = "Changed on disk"
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        storage.close()
+        reloaded = storage.get(State, state.id)
+        self.assertIsNot(reloaded, state)
+        self.assertEqual(reloaded.name, "Changed on disk")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_builds_objects_on_first_use(self):
+        """Test that reloaded records become instances only when used"""
+        storage = FileStorage()
+        state = State(name="Lazy")
+        state.save()
+        key = "State." + state.id
+        storage.delete(state)
+        FileStorage._FileStorage__stamp = None
+        storage.reload()
+        self.assertNotIn(key, storage._FileStorage__objects)
+        self.assertIn(key, storage._FileStorage__raw["State"])
+        self.assertGreaterEqual(storage.count(State), 1)
+        reloaded = storage.get(State, state.id)
+        self.assertIsInstance(reloaded, State)
+        self.assertEqual(reloaded.name, "Lazy")
+        self.assertEqual(reloaded.created_at, state.created_at)
+        self.assertIs(storage.all(State)[key], reloaded)
+        self.assertNotIn(key, storage._FileStorage__raw.get("State", {}))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related_follows_foreign_keys(self):
+        """Test that the reverse foreign key index tracks new, delete and
+        attribute changes"""
+        storage = FileStorage()
+        state, other = State(name="Parent"), State(name="Other")
+        city = City(name="Child", state_id=state.id)
+        for obj in (state, other, city):
+            storage.new(obj)
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(storage.related(City, "state_id", state.id), [city])
+        self.assertEqual(other.cities, [])
+        city.state_id = other.id
+        self.assertEqual(state.cities, [])
+        self.assertEqual(other.cities, [city])
+        place = Place(name="Loft", city_id=city.id)
+        review = Review(text="Nice", place_id=place.id)
+        storage.new(place)
+        storage.new(review)
+        self.assertEqual(city.places, [place])
+        self.assertEqual(place.reviews, [review])
+        storage.delete(review)
+        self.assertEqual(place.reviews, [])
+        for obj in (state, other, city, place):
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_load(self):
+        """Test that all() builds the objects of the relationships named
+        by load and rejects other names"""
+        storage = FileStorage()
+        state = State(name="Loaded")
+        record = City(name="Raw", state_id=state.id).to_dict()
+        key = "City." + record["id"]
+        try:
+            storage.new(state)
+            storage._FileStorage__put_record(key, record)
+            self.assertIn("State." + state.id,
+                          storage.all(State, load=["cities"]))
+            self.assertFalse(FileStorage._FileStorage__raw.get("City"))
+            self.assertEqual([city.id for city in state.cities],
+                             [record["id"]])
+            with self.assertRaises(ValueError):
+                storage.all(State, load=["reviews"])
+        finally:
+            storage.delete(state)
+            storage.delete(storage.get(City, record["id"]))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_counts(self):
+        """Test that counts() agrees with count() for every class"""
+        storage = FileStorage()
+        state = State(name="Counted")
+        storage.new(state)
+        counts = storage.counts()
+        self.assertEqual(set(counts), set(classes))
+        for name in classes:
+            self.assertEqual(counts[name], storage.count(name))
+        self.assertEqual(sum(counts.values()), storage.count())
+        storage.delete(state)
+        self.assertEqual(storage.counts()["State"], counts["State"] - 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_filter(self):
+        """Test equality, membership and range criteria of filter()"""
+        storage = FileStorage()
+        city, other = City(name="A"), City(name="B")
+        cheap = Place(city_id=city.id, price_by_night=40)
+        dear = Place(city_id=city.id, price_by_night=400)
+        away = Place(city_id=other.id, price_by_night=60)
+        for obj in (city, other, cheap, dear, away):
+            storage.new(obj)
+        self.assertEqual(set(storage.filter(Place, city_id=city.id).values()),
+                         {cheap, dear})
+        self.assertEqual(set(storage.filter(
+            Place, city_id__in=[city.id, other.id],
+            price_by_night__lt=100).values()), {cheap, away})
+        self.assertEqual(set(storage.filter(
+            Place, price_by_night__gte=60, price_by_night__lte=400,
+            city_id__in=[city.id, other.id]).values()), {dear, away})
+        self.assertEqual(storage.filter(City, name="B"),
+                         {"City." + other.id: other})
+        self.assertIs(storage.find_one(Place, city_id=other.id), away)
+        self.assertIsNone(storage.find_one(Place, city_id="nowhere"))
+        for obj in (city, other, cheap, dear, away):
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter_all(self):
+        """Test that iter_all() yields stored instances and builds records
+        not built yet"""
+        storage = FileStorage()
+        state = State(name="Iterated")
+        record = City(name="Raw").to_dict()
+        key = "City." + record["id"]
+        try:
+            storage._FileStorage__put_record(key, record)
+            storage.new(state)
+            self.assertIn(state, list(storage.iter_all(State)))
+            cities = list(storage.iter_all("City"))
+            self.assertIn(record["id"], [city.id for city in cities])
+            self.assertIs(storage.get(City, record["id"]),
+                          [city for city in cities
+                           if city.id == record["id"]][0])
+            self.assertIn(state, list(storage.iter_all()))
+        finally:
+            storage.delete(state)
+            storage.delete(storage.get(City, record["id"]))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """Test that page() walks a class in created_at order, following
+        changes made after its index was built"""
+        storage = FileStorage()
+        made = [Amenity(name=str(i), created_at=datetime(2001, 1, 1, 0, i))
+                for i in range(5)]
+        for obj in made[:4]:
+            storage.new(obj)
+
+        def walk(**criteria):
+            seen, cursor = [], None
+            while True:
+                page, cursor = storage.page(Amenity, 2, cursor, **criteria)
+                self.assertLessEqual(len(page), 2)
+                seen.extend(page)
+                if cursor is None:
+                    return [obj for obj in seen if obj in made]
+        self.assertEqual(walk(), made[:4])
+        storage.new(made[4])
+        storage.delete(made[1])
+        self.assertEqual(walk(), [made[0], made[2], made[3], made[4]])
+        self.assertEqual(walk(name="3"), [made[3]])
+        with self.assertRaises(ValueError):
+            storage.page(Amenity, 2, "not a cursor")
+        for obj in made:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places(self):
+        """Test the places search by state, city and amenities"""
+        storage = FileStorage()
+        state = State(name="Iowa")
+        city, away = City(name="Ames", state_id=state.id), City(name="X")
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        both = Place(city_id=city.id, amenity_ids=[wifi.id, pool.id])
+        wifi_only = Place(city_id=city.id, amenity_ids=[wifi.id])
+        elsewhere = Place(city_id=away.id, amenity_ids=[pool.id, wifi.id])
+        made = (state, city, away, wifi, pool, both, wifi_only, elsewhere)
+        for obj in made:
+            storage.new(obj)
+
+        def found(**criteria):
+            places, cursor = storage.search_places(**criteria)
+            return set(places) & {both, wifi_only, elsewhere}
+        self.assertEqual(found(), {both, wifi_only, elsewhere})
+        self.assertEqual(found(states=[state.id]), {both, wifi_only})
+        self.assertEqual(found(cities=[away.id], amenities=[wifi.id]),
+                         {elsewhere})
+        self.assertEqual(found(states=[state.id],
+                               amenities=[wifi.id, pool.id]), {both})
+        self.assertEqual(found(states=["nowhere"]), set())
+        page, cursor = storage.search_places(cities=[city.id], limit=1)
+        rest, end = storage.search_places(cities=[city.id], limit=1,
+                                          cursor=cursor)
+        self.assertEqual(set(page + rest), {both, wifi_only})
+        self.assertIsNone(end)
+        for obj in made:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places_pages_by_creation(self):
+        """Test that an unsorted paged search walks the places in
+        (created_at, id) order, building only the ones it reaches"""
+        storage = FileStorage()
+        city = City(name="Paged")
+        records = {}
+        for i in range(30):
+            record = Place(name="P{}".format(i), city_id=city.id).to_dict()
+            records["Place." + record["id"]] = record
+        order = sorted(records, key=lambda key: (records[key]["created_at"],
+                                                 key))
+        with FileStorage._FileStorage__lock:
+            for key, record in records.items():
+                storage._FileStorage__put_record(key, record)
+        storage.new(city)
+        try:
+            page, cursor = storage.search_places(limit=1)
+            unbuilt = FileStorage._FileStorage__raw.get("Place", {})
+            self.assertGreaterEqual(len(set(records) & set(unbuilt)), 28)
+            found = []
+            while True:
+                found.extend("Place." + place.id for place in page
+                             if "Place." + place.id in records)
+                if cursor is None:
+                    break
+                page, cursor = storage.search_places(limit=4, cursor=cursor)
+            self.assertEqual(found, order)
+            page, end = storage.search_places(cities=[city.id], limit=40)
+            self.assertEqual(["Place." + place.id for place in page], order)
+            self.assertIsNone(end)
+        finally:
+            storage.delete(city)
+            for key in records:
+                storage.delete(storage.get(Place, key.partition(".")[2]))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_amenity_index(self):
+        """Test that searches by amenity follow amenity_ids changes"""
+        storage = FileStorage()
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        place = Place(amenity_ids=[wifi.id])
+        for obj in (wifi, pool, place):
+            storage.new(obj)
+
+        def found(*amenities):
+            places, cursor = storage.search_places(amenities=amenities)
+            return place in list(places)
+        self.assertTrue(found(wifi.id))
+        self.assertFalse(found(pool.id))
+        place.amenities = pool
+        self.assertTrue(found(wifi.id, pool.id))
+        place.amenity_ids.remove(wifi.id)
+        storage.new(place)
+        self.assertFalse(found(wifi.id))
+        self.assertTrue(found(pool.id))
+        storage.delete(place)
+        self.assertFalse(found(pool.id))
+        storage.delete(wifi)
+        storage.delete(pool)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places_sorted(self):
+        """Test the ranges and sort of the places search"""
+        storage = FileStorage()
+        city = City(name="Ames")
+        cheap = Place(city_id=city.id, price_by_night=10, max_guest=2)
+        mid = Place(city_id=city.id, price_by_night=50, max_guest=4)
+        dear = Place(city_id=city.id, price_by_night=90, max_guest=4)
+        made = (city, cheap, mid, dear)
+        for obj in made:
+            storage.new(obj)
+
+        def found(**criteria):
+            places, cursor = storage.search_places(**criteria)
+            return [place for place in places if place in made]
+        self.assertEqual(found(sort=("price_by_night", False)),
+                         [cheap, mid, dear])
+        self.assertEqual(found(sort=("price_by_night", True)),
+                         [dear, mid, cheap])
+        self.assertEqual(set(found(cities=[city.id],
+                                   ranges={"price_by_night": (20, None)})),
+                         {mid, dear})
+        self.assertEqual(found(cities=[city.id],
+                               ranges={"max_guest": (4, 4),
+                                       "price_by_night": (None, 60)}),
+                         [mid])
+        page, cursor = storage.search_places(
+            cities=[city.id], sort=("price_by_night", True), limit=2)
+        self.assertEqual(page, [dear, mid])
+        rest, end = storage.search_places(
+            cities=[city.id], sort=("price_by_night", True), limit=2,
+            cursor=cursor)
+        self.assertEqual((rest, end), ([cheap], None))
+        cheap.price_by_night = 70
+        storage.new(cheap)
+        self.assertEqual(found(cities=[city.id],
+                               sort=("price_by_night", False)),
+                         [mid, cheap, dear])
+        with self.assertRaises(ValueError):
+            storage.search_places(sort=("price_by_night", False), limit=1,
+                                  cursor="nope")
+        for obj in made:
+            storage.delete(obj)
+        self.assertEqual(found(sort=("price_by_night", False)), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places_class_defaults(self):
+        """Test that places without a range field are searched and sorted
+        by the class default, as filter() reads it"""
+        storage = FileStorage()
+        city = City(name="Ames")
+        free = Place(city_id=city.id, name="free")
+        dear = Place(city_id=city.id, price_by_night=90)
+        made = (city, free, dear)
+        for obj in made:
+            storage.new(obj)
+        self.assertNotIn("price_by_night", free.__dict__)
+        places, cursor = storage.search_places(
+            cities=[city.id], ranges={"price_by_night": (None, 100)})
+        self.assertEqual(set(places), {free, dear})
+        places, cursor = storage.search_places(
+            cities=[city.id], sort=("price_by_night", False))
+        self.assertEqual(places, [free, dear])
+        places, cursor = storage.search_places(
+            sort=("price_by_night", False))
+        self.assertIn(free, places)
+        self.assertIn(free, storage.filter(
+            Place, price_by_night__lte=100).values())
+        for obj in made:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_places_near(self):
+        """Test the location searches and that they follow moves"""
+        storage = FileStorage()
+        sf = Place(name="sf", latitude=37.77, longitude=-122.42)
+        oakland = Place(name="oakland", latitude=37.80, longitude=-122.27)
+        nowhere = Place(name="nowhere")
+        made = (sf, oakland, nowhere)
+        for obj in made:
+            storage.new(obj)
+
+        def near(lat, lng, radius, limit=None):
+            return [place for away, place in
+                    storage.places_near(lat, lng, radius, limit)
+                    if place in made]
+        self.assertEqual(near(37.78, -122.41, 50), [sf, oakland])
+        self.assertEqual(near(37.80, -122.26, 50, 1), [oakland])
+        self.assertEqual(near(37.78, -122.41, 2), [sf])
+        places, cursor = storage.search_places(bounds=(37, -123, 38,
+                                                       -122.3))
+        self.assertEqual([p for p in places if p in made], [sf])
+        sf.latitude = 0.0
+        storage.new(sf)
+        self.assertEqual(near(37.78, -122.41, 50), [oakland])
+        for obj in made:
+            storage.delete(obj)
+        self.assertEqual(near(37.78, -122.41, 50), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_text(self):
+        """Test the full-text search and that it follows changes"""
+        storage = FileStorage()
+        cabin = Place(description="Quiet cabin by the lake, lake view")
+        flat = Place(description="Flat near the lake shore")
+        review = Review(text="A quiet stay")
+        made = (cabin, flat, review)
+        for obj in made:
+            storage.new(obj)
+
+        def found(query, limit=None, cursor=None):
+            hits, cursor = storage.search_text(query, limit, cursor)
+            return [obj for score, obj in hits if obj in made], cursor
+        self.assertEqual(found("lake")[0], [cabin, flat])
+        self.assertEqual(set(found("quiet")[0]), {cabin, review})
+        page, cursor = found("lake", 1)
+        self.assertEqual(page, [cabin])
+        self.assertEqual(found("lake", 1, cursor)[0], [flat])
+        flat.description = "Flat downtown"
+        storage.new(flat)
+        self.assertEqual(found("lake")[0], [cabin])
+        self.assertEqual(found("downtown")[0], [flat])
+        storage.delete(cabin)
+        self.assertEqual(found("lake")[0], [])
+        for obj in made:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_version(self):
+        """Test that the version of a class follows its changes only"""
+        storage = FileStorage()
+        before, when = storage.version(State)
+        state = State(name="Iowa")
+        storage.new(state)
+        added, when = storage.version("State")
+        self.assertNotEqual(added, before)
+        self.assertIsInstance(when, datetime)
+        city = City(name="Ames")
+        storage.new(city)
+        self.assertEqual(storage.version(State)[0], added)
+        storage.all(State)
+        storage.get(State, state.id)
+        self.assertEqual(storage.version(State)[0], added)
+        storage.delete(state)
+        self.assertNotIn(storage.version(State)[0], (before, added))
+        storage.delete(city)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_version_shared(self):
+        """Test that a process reading the saved file tags a class as the
+        process that saved it does"""
+        storage = FileStorage()
+        state = State(name="Iowa")
+        storage.new(state)
+        storage.save()
+        tag, when = storage.version(State)
+        self.assertIsInstance(when, datetime)
+        probe = ("from models import storage; "
+                 "print(storage.version('State')[0])")
+        env = {name: value for name, value in os.environ.items()
+               if not name.startswith("HBNB_FILE_")}
+        read = subprocess.run([sys.executable, "-c", probe], env=env,
+                              capture_output=True, text=True, check=True)
+        self.assertEqual(read.stdout.strip(), tag)
+        storage.delete(state)
+        storage.save()
+        self.assertNotEqual(storage.version(State)[0], tag)
+
+    def test_iter_json_items_small_chunks(self):
+        """Test that the streaming parser copes with members split
+        across reads"""
+        doc = {"A.1": {"name": "x \" }, y", "n": [1, 2.5, None]},
+               "B.2": {}, "C.3": {"nested": {"k": "v"}}}
+        f = io.StringIO(" \n" + json.dumps(doc, indent=2))
+        self.assertEqual(dict(file_storage.iter_json_items(f, 3)), doc)
+        f = io.StringIO("{}")
+        self.assertEqual(list(file_storage.iter_json_items(f, 1)), [])
+        with self.assertRaises(ValueError):
+            list(file_storage.iter_json_items(io.StringIO('{"A": {'), 2))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageJournal(PlainModeTestCase):
+    """Test the append-only journal mode of the FileStorage class"""
+    journal = "file.json.journal"
+
+    def setUp(self):
+        """Switch FileStorage to journal mode on a fresh journal"""
+        super().setUp()
+        self.saved = {attr: getattr(FileStorage, attr) for attr in
+                      ("_FileStorage__journal", "_FileStorage__journal_max")}
+        FileStorage._FileStorage__journal = True
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        FileStorage._FileStorage__journal_pos = None
+        FileStorage._FileStorage__dirty.clear()
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restore the snapshot mode and drop the journal"""
+        for attr, value in self.saved.items():
+            setattr(FileStorage, attr, value)
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        FileStorage._FileStorage__journal_pos = None
+        super().tearDown()
+
+    def forget(self, obj):
+        """Drop obj from memory and force the next reload to start over"""
+        key = obj.__class__.__name__ + "." + obj.id
+        self.storage._FileStorage__remove(key)
+        FileStorage._FileStorage__stamp = None
+        FileStorage._FileStorage__journal_pos = None
+
+    def test_save_appends_changed_objects_only(self):
+        """Test that save() appends one journal line per changed object"""
+        state = State(name="Journaled")
+        state.save()
+        with open(self.journal, "r") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["key"], "State." + state.id)
+        with open("file.json", "r") as f:
+            self.assertNotIn("State." + state.id, json.load(f))
+
+    def test_reload_replays_journal(self):
+        """Test that reload() replays upserts and deletes from the journal"""
+        state = State(name="Replayed")
+        state.save()
+        self.forget(state)
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name, "Replayed")
+        self.storage.delete(self.storage.get(State, state.id))
+        self.storage.save()
+        self.storage.new(state)
+        self.forget(state)
+        self.storage.reload()
+        self.assertIsNone(self.storage.get(State, state.id))
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        """Test that the journal is folded into file.json past the limit"""
+        FileStorage._FileStorage__journal_max = 1
+        first = State(name="First")
+        first.save()
+        second = State(name="Second")
+        second.save()
+        self.assertEqual(os.path.getsize(self.journal), 0)
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        self.assertIn("State." + first.id, js)
+        self.assertIn("State." + second.id, js)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageGroupCommit(PlainModeTestCase):
+    """Test the group-commit policy of the FileStorage class"""
+
+    def setUp(self):
+        """Start with nothing pending"""
+        super().setUp()
+        self.storage = FileStorage()
+        self.storage.flush()
+
+    def tearDown(self):
+        """Flush what is left and restore the flush policy"""
+        self.storage.flush()
+        super().tearDown()
+
+    def on_disk(self, obj):
+        """Tell whether obj is in file.json"""
+        with open("file.json", "r") as f:
+            return obj.__class__.__name__ + "." + obj.id in json.load(f)
+
+    def test_flush_after_count(self):
+        """Test that saves are held until enough changes are pending"""
+        FileStorage._FileStorage__flush_count = 2
+        first = State(name="First")
+        first.save()
+        self.assertFalse(self.on_disk(first))
+        second = State(name="Second")
+        second.save()
+        self.assertTrue(self.on_disk(first))
+        self.assertTrue(self.on_disk(second))
+
+    def test_explicit_flush(self):
+        """Test that flush() writes pending changes right away"""
+        FileStorage._FileStorage__flush_count = 100
+        state = State(name="Pending")
+        state.save()
+        self.assertFalse(self.on_disk(state))
+        self.storage.flush()
+        self.assertTrue(self.on_disk(state))
+
+    def test_flush_after_delay(self):
+        """Test that a deferred save is written once the delay elapses"""
+        FileStorage._FileStorage__flush_ms = 50
+        FileStorage._FileStorage__last_flush = time.monotonic()
+        state = State(name="Delayed")
+        state.save()
+        self.assertFalse(self.on_disk(state))
+        time.sleep(0.3)
+        self.assertTrue(self.on_disk(state))
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Contains the TestGeoDocs and TestGeo classes
+"""
+
+import inspect
+from models.engine import geo
+import pep8
+import unittest
+
+
+class TestGeoDocs(unittest.TestCase):
+    """Tests to check the documentation and style of geo"""
+
+    def test_pep8_conformance_geo(self):
+        """Test that models/engine/geo.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/geo.py',
+                                    'tests/test_models/test_engine/\
+test_geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_geo_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(geo.__doc__) >= 1)
+        for func in inspect.getmembers(geo, inspect.isfunction):
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestGeo(unittest.TestCase):
+    """Test the geo functions"""
+
+    def test_distance(self):
+        """Test great-circle distances"""
+        self.assertEqual(geo.distance(10, 20, 10, 20), 0)
+        self.assertAlmostEqual(geo.distance(0, 0, 1, 0), 111.195, 2)
+        self.assertAlmostEqual(geo.distance(0, 179.5, 0, -179.5),
+                               geo.distance(0, 0, 0, 1))
+
+    def test_bounding_box(self):
+        """Test that the box holds the circle and wraps at the
+        antimeridian"""
+        south, west, north, east = geo.bounding_box(45, 10, 100)
+        self.assertTrue(south < 45 < north and west < 10 < east)
+        self.assertAlmostEqual(geo.distance(45, 10, north, 10), 100, 6)
+        box = geo.bounding_box(0, 179.9, 100)
+        self.assertGreater(box[1], box[3])
+        self.assertTrue(geo.in_box(0, -179.5, box))
+        self.assertFalse(geo.in_box(0, 170, box))
+        self.assertEqual(geo.bounding_box(89.5, 0, 100)[1:4:2],
+                         (-180, 180))
+
+    def test_coordinates(self):
+        """Test that only valid points are kept"""
+        self.assertEqual(geo.coordinates(1, 2), (1.0, 2.0))
+        self.assertIsNone(geo.coordinates(None, 2))
+        self.assertIsNone(geo.coordinates(91, 0))
+        self.assertIsNone(geo.coordinates(True, 0))
+        self.assertIsNone(geo.coordinates("1", 0))
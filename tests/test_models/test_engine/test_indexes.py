@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+"""
+Contains the TestIndexesDocs, TestSortedIndex, TestInvertedIndex,
+TestGridIndex and TestTextIndex classes
+"""
+
+import inspect
+from models.engine import indexes
+import pep8
+import unittest
+GridIndex = indexes.GridIndex
+InvertedIndex = indexes.InvertedIndex
+SortedIndex = indexes.SortedIndex
+TextIndex = indexes.TextIndex
+
+
+class TestIndexesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of indexes"""
+
+    def test_pep8_conformance_indexes(self):
+        """Test that models/engine/indexes.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/indexes.py',
+                                    'tests/test_models/test_engine/\
+test_indexes.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_indexes_module_docstring(self):
+        """Test for the indexes.py module docstring"""
+        self.assertIsNot(indexes.__doc__, None,
+                         "indexes.py needs a docstring")
+        self.assertTrue(len(indexes.__doc__) >= 1,
+                        "indexes.py needs a docstring")
+
+    def test_index_func_docstrings(self):
+        """Test for the presence of docstrings in the index methods"""
+        for cls in (SortedIndex, InvertedIndex, GridIndex, TextIndex):
+            for func in inspect.getmembers(cls, inspect.isfunction):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test the SortedIndex class"""
+
+    def test_order(self):
+        """Test that keys come out by value, then by key"""
+        index = SortedIndex([("b", 2), ("a", 2), ("c", 1)])
+        self.assertEqual(index.after(), ["c", "a", "b"])
+        self.assertEqual(index.after(limit=2), ["c", "a"])
+        self.assertEqual(index.after((2, "a")), ["b"])
+        self.assertEqual(index.after((1, "c"), 1), ["a"])
+
+    def test_add_and_discard(self):
+        """Test that add() moves a key and discard() drops it"""
+        index = SortedIndex([("a", 1), ("b", 2)])
+        index.add("a", 3)
+        index.add("c", 0)
+        self.assertEqual(index.after(), ["c", "b", "a"])
+        index.discard("b")
+        index.discard("missing")
+        self.assertEqual(index.after(), ["c", "a"])
+        self.assertEqual(len(index), 2)
+
+    def test_between(self):
+        """Test that between() keeps the keys within inclusive bounds"""
+        index = SortedIndex([("a", 10), ("b", 50), ("c", 50), ("d", 90)])
+        self.assertEqual(index.between(50, 50), ["b", "c"])
+        self.assertEqual(index.between(20, None), ["b", "c", "d"])
+        self.assertEqual(index.between(None, 10), ["a"])
+        self.assertEqual(index.between(60, 80), [])
+        self.assertEqual(index.get("d"), 90)
+        self.assertIsNone(index.get("missing"))
+
+    def test_walk(self):
+        """Test that walk() goes both ways from a position, chunk after
+        chunk"""
+        index = SortedIndex([("a", 10), ("b", 50), ("c", 50), ("d", 90)])
+        self.assertEqual(list(index.walk(chunk=1)),
+                         [(10, "a"), (50, "b"), (50, "c"), (90, "d")])
+        self.assertEqual([key for value, key in index.walk((50, "b"))],
+                         ["c", "d"])
+        self.assertEqual([key for value, key in
+                          index.walk((50, "c"), reverse=True, chunk=1)],
+                         ["b", "a"])
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Test the InvertedIndex class"""
+
+    def test_intersection(self):
+        """Test that intersection() keeps the keys having every term"""
+        index = InvertedIndex()
+        index.add("p1", ["wifi", "pool"])
+        index.add("p2", ["wifi"])
+        index.add("p3", ["pool", "wifi", "gym"])
+        self.assertEqual(index.intersection(["wifi"]), {"p1", "p2", "p3"})
+        self.assertEqual(index.intersection(["pool", "wifi"]), {"p1", "p3"})
+        self.assertEqual(index.intersection(["pool", "spa"]), set())
+        self.assertEqual(index.intersection([]), set())
+
+    def test_add_replaces_terms(self):
+        """Test that add() and discard() undo the terms filed before,
+        even when the caller's list changed since"""
+        index = InvertedIndex()
+        terms = ["wifi", "pool"]
+        index.add("p1", terms)
+        terms.remove("pool")
+        index.add("p1", terms)
+        self.assertEqual(index.intersection(["pool"]), set())
+        index.discard("p1")
+        self.assertEqual(index.intersection(["wifi"]), set())
+        self.assertEqual(len(index), 0)
+
+
+class TestGridIndex(unittest.TestCase):
+    """Test the GridIndex class"""
+
+    def test_within(self):
+        """Test that within() keeps the points inside a box, across the
+        antimeridian too"""
+        index = GridIndex([("sf", (37.77, -122.42)),
+                           ("la", (34.05, -118.24)),
+                           ("fiji", (-17.7, 179.9)),
+                           ("samoa", (-13.8, -171.8))])
+        self.assertEqual(index.within((30, -125, 38, -120)), ["sf"])
+        self.assertEqual(sorted(index.within((-20, 170, 0, -170))),
+                         ["fiji", "samoa"])
+        self.assertEqual(len(index.within((-90, -180, 90, 180))), 4)
+
+    def test_nearest(self):
+        """Test that nearest() orders the points within radius by
+        distance"""
+        index = GridIndex([("sf", (37.77, -122.42)),
+                           ("oakland", (37.80, -122.27)),
+                           ("la", (34.05, -118.24))])
+        found = index.nearest(37.78, -122.41, 50)
+        self.assertEqual([key for away, key in found], ["sf", "oakland"])
+        self.assertLess(found[0][0], found[1][0])
+        self.assertEqual(len(index.nearest(37.78, -122.41, 1000, 2)), 2)
+
+    def test_add_and_discard(self):
+        """Test that add() moves a key and discard() drops it"""
+        index = GridIndex([("a", (0, 0))])
+        index.add("a", 50, 50)
+        self.assertEqual(index.get("a"), (50, 50))
+        self.assertEqual(index.within((-1, -1, 1, 1)), [])
+        index.discard("a")
+        index.discard("missing")
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.within((-90, -180, 90, 180)), [])
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test the TextIndex class and tokenize()"""
+
+    def test_tokenize(self):
+        """Test that terms are lowercased runs of word characters"""
+        self.assertEqual(indexes.tokenize("A Lake-view, 2 rooms!"),
+                         ["lake", "view", "rooms"])
+
+    def test_scores(self):
+        """Test that rarer terms and more occurrences score higher"""
+        index = TextIndex([("a", "lake view and lake shore"),
+                           ("b", "city view"),
+                           ("c", "quiet lake cottage")])
+        scores = index.scores("lake")
+        self.assertEqual(set(scores), {"a", "c"})
+        self.assertGreater(scores["a"], scores["c"])
+        scores = index.scores("quiet view")
+        self.assertGreater(scores["c"], scores["a"])
+        self.assertEqual(index.scores("desert"), {})
+        self.assertEqual(TextIndex().scores("lake"), {})
+
+    def test_add_and_discard(self):
+        """Test that add() replaces the text of a key and discard() drops
+        it"""
+        index = TextIndex([("a", "lake view")])
+        index.add("a", "city loft")
+        self.assertEqual(index.scores("lake"), {})
+        self.assertEqual(set(index.scores("loft")), {"a"})
+        index.discard("a")
+        index.discard("missing")
+        self.assertEqual(index.scores("loft"), {})
+        self.assertEqual(len(index), 0)
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+"""
+Contains the TestMmapStorageDocs and TestMmapStorage classes
+"""
+
+import inspect
+from models.engine import mmap_storage
+from models.city import City
+from models.state import State
+import os
+import pep8
+import tempfile
+import unittest
+MmapStorage = mmap_storage.MmapStorage
+
+
+class TestMmapStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of MmapStorage class"""
+
+    def test_pep8_conformance_mmap_storage(self):
+        """Test that models/engine/mmap_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/mmap_storage.py',
+                                    'tests/test_models/test_engine/\
+test_mmap_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_mmap_storage_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(mmap_storage.__doc__) >= 1)
+        self.assertTrue(len(MmapStorage.__doc__) >= 1)
+        for func in inspect.getmembers(MmapStorage, inspect.isfunction):
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestMmapStorage(unittest.TestCase):
+    """Test the MmapStorage class"""
+
+    def setUp(self):
+        """Point a fresh MmapStorage at a temporary snapshot"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.bin")
+        self.storage = self.open()
+
+    def tearDown(self):
+        """Drop the temporary snapshot"""
+        self.tmp.cleanup()
+
+    def open(self):
+        """returns a new MmapStorage reading self.path"""
+        storage = MmapStorage()
+        storage._MmapStorage__file_path = self.path
+        storage.reload()
+        return storage
+
+    def test_get_decodes_saved_record(self):
+        """Test that records written by save() are read back on demand"""
+        state = State(name="Mapped")
+        self.storage.new(state)
+        self.storage.save()
+        other = self.open()
+        loaded = other.get(State, state.id)
+        self.assertIsNot(loaded, state)
+        self.assertEqual(loaded.name, "Mapped")
+        self.assertEqual(loaded.created_at, state.created_at)
+        self.assertIsNone(other.get(City, state.id))
+        self.assertEqual(other.count(State), 1)
+
+    def test_all_is_lazy(self):
+        """Test that all(cls) maps keys to objects built on access"""
+        states = [State(name="S{}".format(i)) for i in range(3)]
+        city = City(name="C", state_id=states[0].id)
+        for obj in states + [city]:
+            self.storage.new(obj)
+        self.storage.save()
+        other = self.open()
+        objs = other.all(State)
+        self.assertEqual(len(objs), 3)
+        self.assertIn("State." + states[1].id, objs)
+        self.assertNotIn("City." + city.id, objs)
+        self.assertEqual(sorted(s.name for s in objs.values()),
+                         ["S0", "S1", "S2"])
+        self.assertEqual(len(other.all()), 4)
+
+    def test_save_keeps_untouched_records(self):
+        """Test that a second save() carries over records, updates and
+        deletes"""
+        kept, changed, gone = State(name="K"), State(name="C"), State()
+        for obj in (kept, changed, gone):
+            self.storage.new(obj)
+        self.storage.save()
+        changed = self.storage.get(State, changed.id)
+        changed.name = "Changed"
+        self.storage.new(changed)
+        self.storage.delete(gone)
+        self.storage.save()
+        other = self.open()
+        self.assertEqual(other.get(State, kept.id).name, "K")
+        self.assertEqual(other.get(State, changed.id).name, "Changed")
+        self.assertIsNone(other.get(State, gone.id))
+        self.assertEqual(other.count(), 2)
+
+    def test_lookups_share_decoded_object(self):
+        """Test that repeated lookups return the object decoded first, so
+        an edit to one lookup is saved through another"""
+        state = State(name="Nevada")
+        self.storage.new(state)
+        self.storage.save()
+        other = self.open()
+        key = "State." + state.id
+        loaded = other.get(State, state.id)
+        self.assertIs(other.get(State, state.id), loaded)
+        self.assertIs(other.all()[key], loaded)
+        other.all(State)[key].name = "Utah"
+        other.new(other.all()[key])
+        other.save()
+        self.assertEqual(self.open().get(State, state.id).name, "Utah")
+        self.assertIsNot(other.get(State, state.id), loaded)
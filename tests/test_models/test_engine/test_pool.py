@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Contains the TestPoolDocs and TestTimedQueuePool classes
+"""
+
+import inspect
+from models.engine import pool
+import os
+import pep8
+import sqlite3
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError
+import unittest
+from unittest import mock
+TimedQueuePool = pool.TimedQueuePool
+
+
+class TestPoolDocs(unittest.TestCase):
+    """Tests to check the documentation and style of pool"""
+
+    def test_pep8_conformance_pool(self):
+        """Test that models/engine/pool.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pool.py',
+                                    'tests/test_models/test_engine/\
+test_pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pool_docstrings(self):
+        """Test for the module, class and function docstrings"""
+        self.assertTrue(len(pool.__doc__) >= 1)
+        self.assertTrue(len(TimedQueuePool.__doc__) >= 1)
+        self.assertTrue(len(pool.pool_options.__doc__) >= 1)
+        for func in inspect.getmembers(TimedQueuePool, inspect.isfunction):
+            if func[1].__module__ == pool.__name__:
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestTimedQueuePool(unittest.TestCase):
+    """Test the pool settings and metrics"""
+
+    def test_pool_options(self):
+        """Test that the environment sizes and tunes the pool"""
+        env = {"HBNB_DB_POOL_SIZE": "2", "HBNB_DB_MAX_OVERFLOW": "1",
+               "HBNB_DB_POOL_TIMEOUT": "0.5", "HBNB_DB_POOL_RECYCLE": "60",
+               "HBNB_DB_POOL_PRE_PING": "0"}
+        with mock.patch.dict(os.environ, env):
+            options = pool.pool_options()
+        self.assertIs(options["poolclass"], TimedQueuePool)
+        self.assertEqual((options["pool_size"], options["max_overflow"],
+                          options["pool_timeout"], options["pool_recycle"]),
+                         (2, 1, 0.5, 60))
+        self.assertFalse(options["pool_pre_ping"])
+
+    def test_status_dict(self):
+        """Test that checkouts, overflow and timeouts are reported"""
+        engine = create_engine(
+            "sqlite://", poolclass=TimedQueuePool, pool_size=1,
+            max_overflow=1, pool_timeout=0.05,
+            creator=lambda: sqlite3.connect(":memory:",
+                                            check_same_thread=False))
+        first = engine.connect()
+        second = engine.connect()
+        status = engine.pool.status_dict()
+        self.assertEqual((status["checked_out"], status["idle"],
+                          status["overflow"], status["checkouts"]),
+                         (2, 0, 1, 2))
+        with self.assertRaises(TimeoutError):
+            engine.connect()
+        self.assertEqual(engine.pool.status_dict()["timeouts"], 1)
+        self.assertGreaterEqual(engine.pool.status_dict()["wait_max"], 0.05)
+        second.close()
+        first.close()
+        status = engine.pool.status_dict()
+        self.assertEqual((status["checked_out"], status["idle"]), (0, 1))
+        engine.dispose()
@@ -0,0 +1,304 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+from datetime import datetime
+import inspect
+import models
+from models.engine import sqlite_storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import sqlalchemy
+import tempfile
+import unittest
+from unittest import mock
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py',
+                                    'tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_docstrings(self):
+        """Test for the module and class docstrings"""
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1)
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1)
+        self.assertTrue(len(SQLiteStorage.__init__.__doc__) >= 1)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+
+    def setUp(self):
+        """Open a SQLiteStorage on a temporary database file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "hbnb.db")
+        with mock.patch.dict(os.environ, {"HBNB_SQLITE_PATH": path}):
+            self.storage = SQLiteStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        """Close the session and drop the database file"""
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test that objects saved can be read back by class and id"""
+        state = State(name="California")
+        self.storage.new(state)
+        city = City(name="San Francisco", state_id=state.id)
+        self.storage.new(city)
+        self.storage.save()
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertIn("City." + city.id, self.storage.all(City))
+
+    def test_pragmas(self):
+        """Test that connections run in WAL mode with foreign keys on"""
+        engine = self.storage._DBStorage__engine
+        with engine.connect() as conn:
+            mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            fks = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        self.assertEqual(mode, "wal")
+        self.assertEqual(fks, 1)
+
+    def test_foreign_keys_indexed(self):
+        """Test that the foreign key columns have an index"""
+        engine = self.storage._DBStorage__engine
+        with engine.connect() as conn:
+            indexed = {row[2] for row in conn.exec_driver_sql(
+                "PRAGMA index_info('ix_cities_state_id')")}
+        self.assertEqual(indexed, {"state_id"})
+
+    def test_pool_status(self):
+        """Test that the pool reports the connection the session holds"""
+        self.storage.count()
+        status = self.storage.pool_status()
+        self.assertEqual(status["checked_out"], 1)
+        self.assertGreaterEqual(status["checkouts"], 1)
+        self.storage.close()
+        self.assertEqual(self.storage.pool_status()["checked_out"], 0)
+
+    def test_get_by_class_name(self):
+        """Test that get() resolves class names"""
+        state = State(name="Nevada")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertIs(self.storage.get("State", state.id), state)
+        self.assertIsNone(self.storage.get("Nowhere", state.id))
+
+    def test_get_cache(self):
+        """Test that get() answers from its cache until a commit changes
+        the object"""
+        self.storage.close()
+        path = os.path.join(self.tmp.name, "hbnb.db")
+        env = {"HBNB_SQLITE_PATH": path, "HBNB_DB_GET_CACHE": "8"}
+        with mock.patch.dict(os.environ, env):
+            self.storage = SQLiteStorage()
+        self.storage.reload()
+        state = State(name="Oregon")
+        self.storage.new(state)
+        self.storage.save()
+        statements = []
+        sqlalchemy.event.listen(self.storage._DBStorage__engine,
+                                "before_cursor_execute",
+                                lambda *args: statements.append(args[2]))
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Oregon")
+        self.assertEqual(len(statements), 1)
+        self.storage.close()
+        cached = self.storage.get(State, state.id)
+        self.assertEqual(cached.name, "Oregon")
+        self.assertEqual(len(statements), 1)
+        cached.name = "Idaho"
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Idaho")
+
+    def test_eager_load(self):
+        """Test that load fetches relationships with the objects"""
+        state = State(name="Utah")
+        self.storage.new(state)
+        self.storage.new(City(name="Provo", state_id=state.id))
+        self.storage.save()
+        self.storage.close()
+        statements = []
+        sqlalchemy.event.listen(self.storage._DBStorage__engine,
+                                "before_cursor_execute",
+                                lambda *args: statements.append(args[2]))
+        states = self.storage.all(State, load=["cities"])
+        self.assertEqual(len(statements), 2)
+        self.assertEqual([city.name for state in states.values()
+                          for city in state.cities], ["Provo"])
+        self.assertEqual(len(statements), 2)
+        found = self.storage.filter(State, load=["cities"], name="Utah")
+        self.assertEqual(len(found), 1)
+        with self.assertRaises(ValueError):
+            self.storage.all(State, load=["name"])
+
+    def test_search_places(self):
+        """Test that a paginated places search is one statement"""
+        state, other = State(name="Iowa"), State(name="Ohio")
+        city = City(name="Ames", state_id=state.id)
+        away = City(name="Akron", state_id=other.id)
+        user = User(email="s@hbnb.io", password="pwd")
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        both = Place(name="both", city_id=city.id, user_id=user.id)
+        wifi_only = Place(name="wifi", city_id=city.id, user_id=user.id)
+        elsewhere = Place(name="away", city_id=away.id, user_id=user.id)
+        both.amenities.extend([wifi, pool])
+        wifi_only.amenities.append(wifi)
+        elsewhere.amenities.extend([wifi, pool])
+        for obj in (state, other, city, away, user, wifi, pool, both,
+                    wifi_only, elsewhere):
+            self.storage.new(obj)
+        self.storage.save()
+
+        def names(**criteria):
+            places, cursor = self.storage.search_places(**criteria)
+            return sorted(place.name for place in places)
+        self.assertEqual(names(), ["away", "both", "wifi"])
+        self.assertEqual(names(states=[state.id]), ["both", "wifi"])
+        self.assertEqual(names(states=[state.id], cities=[away.id]),
+                         ["away", "both", "wifi"])
+        self.assertEqual(names(amenities=[wifi.id, pool.id]),
+                         ["away", "both"])
+        self.assertEqual(names(states=["nowhere"]), [])
+        statements = []
+        sqlalchemy.event.listen(self.storage._DBStorage__engine,
+                                "before_cursor_execute",
+                                lambda *args: statements.append(args[2]))
+        page, cursor = self.storage.search_places(
+            cities=[city.id], amenities=[wifi.id], limit=1)
+        self.assertEqual(len(statements), 1)
+        rest, end = self.storage.search_places(
+            cities=[city.id], amenities=[wifi.id], limit=1, cursor=cursor)
+        self.assertEqual({page[0].name, rest[0].name}, {"both", "wifi"})
+        self.assertIsNone(end)
+
+    def test_search_places_sorted(self):
+        """Test that a sorted page of a places search is one statement
+        reading limit + 1 rows in order"""
+        state = State(name="Iowa")
+        city = City(name="Ames", state_id=state.id)
+        user = User(email="s@hbnb.io", password="pwd")
+        places = [Place(name=name, city_id=city.id, user_id=user.id,
+                        price_by_night=price, max_guest=guests)
+                  for name, price, guests in (("cheap", 10, 2),
+                                              ("mid", 50, 4),
+                                              ("dear", 90, 4))]
+        for obj in [state, city, user] + places:
+            self.storage.new(obj)
+        self.storage.save()
+
+        def names(**criteria):
+            found, cursor = self.storage.search_places(**criteria)
+            return [place.name for place in found]
+        self.assertEqual(names(sort=("price_by_night", False)),
+                         ["cheap", "mid", "dear"])
+        self.assertEqual(names(ranges={"max_guest": (4, None)},
+                               sort=("price_by_night", True)),
+                         ["dear", "mid"])
+        self.assertEqual(names(ranges={"price_by_night": (20, 60)}),
+                         ["mid"])
+        statements = []
+        sqlalchemy.event.listen(self.storage._DBStorage__engine,
+                                "before_cursor_execute",
+                                lambda *args: statements.append(args[2]))
+        page, cursor = self.storage.search_places(
+            states=[state.id], sort=("price_by_night", True), limit=2)
+        self.assertEqual(len(statements), 1)
+        self.assertIn("ORDER BY places.price_by_night DESC", statements[0])
+        self.assertEqual([place.name for place in page], ["dear", "mid"])
+        rest, end = self.storage.search_places(
+            states=[state.id], sort=("price_by_night", True), limit=2,
+            cursor=cursor)
+        self.assertEqual([place.name for place in rest], ["cheap"])
+        self.assertIsNone(end)
+
+    def test_places_near(self):
+        """Test that location searches read the box around the circle"""
+        state = State(name="California")
+        city = City(name="SF", state_id=state.id)
+        user = User(email="s@hbnb.io", password="pwd")
+        places = [Place(name=name, city_id=city.id, user_id=user.id,
+                        latitude=lat, longitude=lng)
+                  for name, lat, lng in (("sf", 37.77, -122.42),
+                                         ("oakland", 37.80, -122.27),
+                                         ("la", 34.05, -118.24))]
+        places.append(Place(name="nowhere", city_id=city.id,
+                            user_id=user.id))
+        for obj in [state, city, user] + places:
+            self.storage.new(obj)
+        self.storage.save()
+
+        def near(*args):
+            return [place.name for away, place in
+                    self.storage.places_near(*args)]
+        self.assertEqual(near(37.78, -122.41, 50), ["sf", "oakland"])
+        self.assertEqual(near(37.80, -122.26, 1000, 2), ["oakland", "sf"])
+        places, cursor = self.storage.search_places(
+            bounds=(30, -125, 38, -118), sort=("price_by_night", False))
+        self.assertEqual(sorted(place.name for place in places),
+                         ["la", "oakland", "sf"])
+
+    def test_search_text(self):
+        """Test that the full-text index follows commits and rollbacks"""
+        state = State(name="Iowa")
+        city = City(name="Ames", state_id=state.id)
+        user = User(email="s@hbnb.io", password="pwd")
+        cabin = Place(name="cabin", city_id=city.id, user_id=user.id,
+                      description="Quiet cabin by the lake, lake view")
+        flat = Place(name="flat", city_id=city.id, user_id=user.id,
+                     description="Flat near the lake shore")
+        for obj in (state, city, user, cabin, flat):
+            self.storage.new(obj)
+        self.storage.save()
+
+        def names(query, limit=None, cursor=None):
+            hits, cursor = self.storage.search_text(query, limit, cursor)
+            return [obj.name for score, obj in hits], cursor
+        self.assertEqual(names("lake")[0], ["cabin", "flat"])
+        page, cursor = names("lake", 1)
+        self.assertEqual(names("lake", 1, cursor), (["flat"], None))
+        flat.description = "Flat downtown"
+        self.storage.save()
+        self.assertEqual(names("lake")[0], ["cabin"])
+        cabin.description = "Loft"
+        self.storage._DBStorage__session.flush()
+        self.storage._DBStorage__session.rollback()
+        self.assertEqual(names("lake")[0], ["cabin"])
+        self.storage.delete(cabin)
+        self.storage.save()
+        self.assertEqual(names("lake")[0], [])
+
+    def test_version(self):
+        """Test that the version of a class follows its rows"""
+        self.assertEqual(self.storage.version(State), ("0", None))
+        state = State(name="Iowa")
+        self.storage.new(state)
+        self.storage.save()
+        added, when = self.storage.version("State")
+        self.assertIsNone(when)
+        state.name = "Ohio"
+        state.updated_at = datetime.utcnow()
+        self.storage.save()
+        self.assertNotEqual(self.storage.version(State)[0], added)
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertEqual(self.storage.version(State), ("0", None))
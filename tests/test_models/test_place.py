@@ -7,6 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models import place
+from models.amenity import Amenity
 from models.base_model import BaseModel
 import pep8
 import unittest
@@ -171,6 +172,20 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(type(place.amenity_ids), list)
         self.assertEqual(len(place.amenity_ids), 0)
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_amenity_ids_not_shared(self):
+        """Test that each Place has its own amenity_ids list and that the
+        amenities setter adds an Amenity's id once"""
+        place, other = Place(), Place()
+        place.amenity_ids.append("a1")
+        self.assertEqual(other.amenity_ids, [])
+        self.assertEqual(Place.amenity_ids, [])
+        amenity = Amenity()
+        place.amenities = amenity
+        place.amenities = amenity
+        place.amenities = "not an amenity"
+        self.assertEqual(place.amenity_ids, ["a1", amenity.id])
+
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         p = Place()
@@ -3,16 +3,17 @@
 starts a Flask web application
 """
 
+from api.v1.compression import compress
 from flask import Flask, render_template
 from models import *
 from models import storage
-app = Flask(__name__)
+app = compress(Flask(__name__))
 
 
 @app.route('/hbnb_filters', strict_slashes=False)
 def filters():
     """display a HTML page like 6-index.html from static"""
-    states = storage.all("State").values()
+    states = storage.all("State", load=["cities"]).values()
     amenities = storage.all("Amenity").values()
     return render_template('10-hbnb_filters.html', states=states,
                            amenities=amenities)
@@ -3,10 +3,11 @@
 starts a Flask web application
 """
 
+from api.v1.compression import compress
 from flask import Flask, render_template
 from models import *
 from models import storage
-app = Flask(__name__)
+app = compress(Flask(__name__))
 
 
 @app.route('/states_list', strict_slashes=False)
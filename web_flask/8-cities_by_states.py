@@ -3,16 +3,17 @@
 starts a Flask web application
 """
 
+from api.v1.compression import compress
 from flask import Flask, render_template
 from models import *
 from models import storage
-app = Flask(__name__)
+app = compress(Flask(__name__))
 
 
 @app.route('/cities_by_states', strict_slashes=False)
 def cities_by_states():
     """display the states and cities listed in alphabetical order"""
-    states = storage.all("State").values()
+    states = storage.all("State", load=["cities"]).values()
     return render_template('8-cities_by_states.html', states=states)
 
 